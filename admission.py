@@ -0,0 +1,137 @@
+import os
+import math
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from collections.abc import Hashable
+
+from pydantic_ai.usage import UsageLimits
+
+from telemetry import ADMISSIONS
+
+# ✅ Admission settings
+SESSION_RATE = float(os.getenv("RATE_LIMIT_SESSION_PER_MIN", "20")) / 60
+SESSION_BURST = int(os.getenv("RATE_LIMIT_SESSION_BURST", "5"))
+IP_RATE = float(os.getenv("RATE_LIMIT_IP_PER_MIN", "120")) / 60
+IP_BURST = int(os.getenv("RATE_LIMIT_IP_BURST", "20"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "10000"))
+# Only trust X-Forwarded-For when the app runs behind a proxy that sets it
+TRUST_FORWARDED_FOR = os.getenv("TRUST_FORWARDED_FOR", "false").lower() == "true"
+# Agent runs allowed to hold a model call at once, and how long a request may wait for a slot before being shed
+MODEL_CONCURRENCY = int(os.getenv("MODEL_CONCURRENCY", "16"))
+MODEL_QUEUE_TIMEOUT = float(os.getenv("MODEL_QUEUE_TIMEOUT", "0.5"))
+# Per-request budget: model round trips and total tokens one question may use
+REQUEST_MODEL_CALLS = int(os.getenv("REQUEST_MODEL_CALLS", "4"))
+REQUEST_TOKEN_BUDGET = int(os.getenv("REQUEST_TOKEN_BUDGET", "16000"))
+# On shutdown, how long to wait for agent runs already in flight to finish
+DRAIN_TIMEOUT = float(os.getenv("DRAIN_TIMEOUT", "25"))
+
+request_usage_limits = UsageLimits(request_limit=REQUEST_MODEL_CALLS, total_tokens_limit=REQUEST_TOKEN_BUDGET)
+
+
+class RateLimiter:
+    """Token-bucket rate limit per key (session ID, client IP, ...).
+
+    Each key refills at `rate` tokens per second up to `burst`. Idle keys are
+    evicted least recently used first once there are more than `max_keys`.
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[Hashable, tuple[float, float]] = OrderedDict()
+
+    def acquire(self, key: Hashable) -> float:
+        """Take one token for `key`; returns 0 if allowed, else seconds until a token is available."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            retry_after = 0.0
+        else:
+            self._buckets[key] = (tokens, now)
+            retry_after = (1 - tokens) / self.rate if self.rate else float("inf")
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+
+class Overloaded(Exception):
+    """Raised when no model slot frees up within the queue timeout; the caller should answer 429."""
+
+
+class ModelGate:
+    """Global cap on agent runs in flight, shedding load instead of queueing without bound."""
+
+    def __init__(self, limit: int = MODEL_CONCURRENCY, timeout: float = MODEL_QUEUE_TIMEOUT):
+        self.limit = limit
+        self.timeout = timeout
+        self.in_flight = 0
+        self.draining = False
+        self._semaphore = asyncio.Semaphore(limit)
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    async def acquire(self) -> None:
+        if self.draining:
+            raise Overloaded("shutting down")
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            raise Overloaded(f"{self.limit} model runs already in flight") from None
+        self.in_flight += 1
+        self._idle.clear()
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+        if self.in_flight == 0:
+            self._idle.set()
+
+    async def drain(self, timeout: float = DRAIN_TIMEOUT) -> None:
+        """Stop admitting new runs and wait for the ones in flight to finish."""
+        self.draining = True
+        if self.in_flight:
+            logging.info(f"⏳ Draining {self.in_flight} agent runs...")
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            logging.warning(f"⚠️ {self.in_flight} agent runs still in flight after {timeout}s, shutting down anyway.")
+
+    async def __aenter__(self) -> "ModelGate":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.release()
+
+
+session_limiter = RateLimiter(SESSION_RATE, SESSION_BURST)
+ip_limiter = RateLimiter(IP_RATE, IP_BURST)
+model_gate = ModelGate()
+
+
+def client_ip(request) -> str | None:
+    if TRUST_FORWARDED_FOR and (forwarded := request.headers.get("x-forwarded-for")):
+        return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else None
+
+
+def retry_after_header(seconds: float) -> dict[str, str]:
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
+
+
+def admit(endpoint: str, session_id: str, ip: str | None) -> float:
+    """Check the per-session and per-IP limits; returns 0 if admitted, else a Retry-After in seconds."""
+    if ip and (retry_after := ip_limiter.acquire(ip)):
+        ADMISSIONS.inc(endpoint=endpoint, outcome="rate_limited_ip")
+        return retry_after
+    if retry_after := session_limiter.acquire(session_id):
+        ADMISSIONS.inc(endpoint=endpoint, outcome="rate_limited_session")
+        return retry_after
+    ADMISSIONS.inc(endpoint=endpoint, outcome="admitted")
+    return 0.0
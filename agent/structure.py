@@ -2,36 +2,13 @@ from typing import Dict, List, Optional
 import nest_asyncio
 from pydantic import BaseModel, Field
 from pydantic_ai import Agent
-from pydantic_ai.models.gemini import GeminiModel
-from pydantic_ai.providers.google_gla import GoogleGLAProvider
 import os
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
-gem_api : str = os.getenv("API_KEY")
+from registry import LazyModel
 
-model = GeminiModel(
-    'gemini-2.0-flash', provider=GoogleGLAProvider(api_key=gem_api)
-)
-basic_agent = Agent(model=model,
+basic_agent = Agent(model=LazyModel(),
               system_prompt = "You are helpful travel assistant")
 
-response = basic_agent.run_sync("How to travel from china to US")
-print(response.data)
-print(response.all_messages())
-print(response.usage())
-
-response2 = basic_agent.run_sync(
-    user_prompt="What was my previous question?",
-    message_history=response.new_messages(),
-)
-
-print(response2.data)
-
-print("-" * 100)
-
-
 
 class ResponseModel(BaseModel):
     """Structured response with metadata."""
@@ -43,7 +20,7 @@ class ResponseModel(BaseModel):
 
 
 agent2 = Agent(
-    model=model,
+    model=LazyModel(),
     result_type=ResponseModel,
     system_prompt=(
         "You are an intelligent customer support agent. "
@@ -51,5 +28,27 @@ agent2 = Agent(
     ),
 )
 
-response = agent2.run_sync("How can I track my order #12345?")
-print(response.data.model_dump_json(indent=2))
+
+def main():
+    response = basic_agent.run_sync("How to travel from china to US")
+    print(response.data)
+    print(response.all_messages())
+    print(response.usage())
+
+    response2 = basic_agent.run_sync(
+        user_prompt="What was my previous question?",
+        message_history=response.new_messages(),
+    )
+
+    print(response2.data)
+
+    print("-" * 100)
+
+    response = agent2.run_sync("How can I track my order #12345?")
+    print(response.data.model_dump_json(indent=2))
+
+
+# Run the script (from the repo root: python -m agent.structure)
+if __name__ == "__main__":
+    nest_asyncio.apply()  # Enable nested event loops
+    main()
@@ -0,0 +1,155 @@
+import os
+import asyncio
+import logging
+from datetime import date
+from typing import Any
+
+from cache import AsyncTTLCache
+from repository import get_repository
+
+# ✅ Availability settings
+# The occupancy index is updated in place as booking changes arrive (see db_changes.py) and rebuilt
+# from Supabase this often, which also picks up changes made while no webhook was delivered
+AVAILABILITY_REFRESH_TTL = float(os.getenv("AVAILABILITY_REFRESH_TTL", "300"))
+# How long past that the last index may still answer while Supabase is failing
+AVAILABILITY_STALE_TTL = float(os.getenv("AVAILABILITY_STALE_TTL", "3600"))
+MAX_STAY_NIGHTS = int(os.getenv("MAX_STAY_NIGHTS", "60"))
+# Booking statuses that don't hold a room, and room statuses that take a room out of service
+INACTIVE_BOOKING_STATUSES = frozenset(
+    s.strip().lower() for s in os.getenv("INACTIVE_BOOKING_STATUSES", "cancelled,canceled").split(",") if s.strip()
+)
+UNBOOKABLE_ROOM_STATUSES = frozenset(
+    s.strip().lower() for s in os.getenv("UNBOOKABLE_ROOM_STATUSES", "maintenance,out of service").split(",") if s.strip()
+)
+OCCUPANCY_KEY = "occupancy"
+
+
+def _to_date(value: str | date) -> date:
+    return value if isinstance(value, date) else date.fromisoformat(value[:10])
+
+
+class OccupancyIndex:
+    """Booked nights per room as int bitmaps.
+
+    Bit i of a room's bitmap is set when the night starting `origin + i` is booked, so
+    whether a room is free for a stay is a single AND against the stay's mask, and a
+    query checks every room in one pass over `rooms`. Nights before `origin` are
+    dropped; they can't be booked any more.
+    """
+
+    def __init__(self, rooms: list[dict[str, Any]], bookings: list[dict[str, Any]], origin: date):
+        self.origin = origin
+        self.rooms = [room for room in rooms if str(room.get("status", "")).lower() not in UNBOOKABLE_ROOM_STATUSES]
+        self._bitmaps: dict[Any, int] = {}
+        # booking id -> (room id, night mask)
+        self._bookings: dict[Any, tuple[Any, int]] = {}
+        for booking in bookings:
+            self.add(booking)
+
+    def mask(self, check_in: date, check_out: date) -> int:
+        """Bits for the nights from `check_in` up to, not including, `check_out`."""
+        start = max(0, (check_in - self.origin).days)
+        end = (check_out - self.origin).days
+        return ((1 << (end - start)) - 1) << start if end > start else 0
+
+    def add(self, booking: dict[str, Any]) -> None:
+        """Insert or update one booking; bookings with an inactive status are removed."""
+        self.discard(booking["id"])
+        if str(booking.get("status", "")).lower() in INACTIVE_BOOKING_STATUSES or booking.get("room_id") is None:
+            return
+        nights = self.mask(_to_date(booking["check_in_date"]), _to_date(booking["check_out_date"]))
+        if not nights:
+            return
+        room_id = booking["room_id"]
+        self._bookings[booking["id"]] = (room_id, nights)
+        self._bitmaps[room_id] = self._bitmaps.get(room_id, 0) | nights
+
+    def discard(self, booking_id: Any) -> None:
+        if (entry := self._bookings.pop(booking_id, None)) is None:
+            return
+        room_id = entry[0]
+        # Recompute rather than clear the bits, in case another booking overlaps the same nights.
+        bitmap = 0
+        for other_room, nights in self._bookings.values():
+            if other_room == room_id:
+                bitmap |= nights
+        self._bitmaps[room_id] = bitmap
+
+    def available(self, check_in: date, check_out: date, guests: int = 1) -> list[dict[str, Any]]:
+        """Rooms fitting `guests` with none of the requested nights booked, cheapest first."""
+        stay = self.mask(check_in, check_out)
+        bitmaps = self._bitmaps
+        return [
+            room for room in self.rooms
+            if room["max_guests"] >= guests and not bitmaps.get(room["id"], 0) & stay
+        ]
+
+    def __len__(self) -> int:
+        return len(self._bookings)
+
+
+occupancy_cache = AsyncTTLCache(ttl=AVAILABILITY_REFRESH_TTL, stale_ttl=AVAILABILITY_STALE_TTL)
+# Changes recorded while a rebuild is in flight, replayed onto the new index so they aren't lost
+_pending_changes: list[list[tuple[str, Any]]] = []
+
+
+async def occupancy_index() -> OccupancyIndex:
+    async def build() -> OccupancyIndex:
+        logging.info("🔄 Building the occupancy index from Supabase.")
+        changes: list[tuple[str, Any]] = []
+        _pending_changes.append(changes)
+        try:
+            today = date.today()
+            repository = get_repository()
+            rooms, bookings = await asyncio.gather(repository.list_rooms(), repository.list_occupancy(today))
+            index = OccupancyIndex(rooms, bookings, today)
+            for action, value in changes:
+                if action == "add":
+                    index.add(value)
+                else:
+                    index.discard(value)
+        finally:
+            _pending_changes.remove(changes)
+        logging.info(f"✅ Occupancy index built: {len(index.rooms)} rooms, {len(index)} upcoming bookings.")
+        return index
+
+    return await occupancy_cache.get_or_fetch(OCCUPANCY_KEY, build)
+
+
+def record_booking(booking: dict[str, Any]) -> None:
+    """Call with the row whenever a booking is created or changed (needs id, room_id, dates and status)."""
+    if (index := occupancy_cache.peek(OCCUPANCY_KEY)) is not None:
+        index.add(booking)
+    for changes in _pending_changes:
+        changes.append(("add", booking))
+
+
+def forget_booking(booking_id: Any) -> None:
+    """Call whenever a booking is deleted."""
+    if (index := occupancy_cache.peek(OCCUPANCY_KEY)) is not None:
+        index.discard(booking_id)
+    for changes in _pending_changes:
+        changes.append(("discard", booking_id))
+
+
+def invalidate_occupancy() -> None:
+    """Call whenever a room is added or its status changes; the next query rebuilds the index."""
+    occupancy_cache.invalidate(OCCUPANCY_KEY)
+
+
+async def find_available_rooms(check_in: date, check_out: date, guests: int = 1) -> list[dict[str, Any]]:
+    """Rooms free for every night of the stay that fit `guests`, cheapest first.
+
+    Raises ValueError for stays in the past, empty or longer than MAX_STAY_NIGHTS, or fewer than one guest.
+    The returned rows are shared between callers and must not be mutated.
+    """
+    if check_in < date.today():
+        raise ValueError("The check-in date is in the past.")
+    if check_out <= check_in:
+        raise ValueError("The check-out date must be after the check-in date.")
+    if (check_out - check_in).days > MAX_STAY_NIGHTS:
+        raise ValueError(f"Stays can be at most {MAX_STAY_NIGHTS} nights.")
+    if guests < 1:
+        raise ValueError("At least one guest is needed.")
+    index = await occupancy_index()
+    return index.available(check_in, check_out, guests)
@@ -0,0 +1,88 @@
+"""Gemini stand-in for benchmarks: a FunctionModel with artificial latency, fault injection and a call counter."""
+
+import asyncio
+import random
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+
+from pydantic_ai.exceptions import ModelHTTPError
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, TextPart, ToolCallPart, ToolReturnPart, UserPromptPart
+from pydantic_ai.models.function import AgentInfo, DeltaToolCall, FunctionModel
+
+
+@dataclass
+class ModelStats:
+    calls: int = 0
+    errors: int = 0
+    slow: int = 0
+
+
+@dataclass
+class Faults:
+    """Injected failures; change the rates while a benchmark runs to simulate an outage."""
+
+    error_rate: float = 0.0
+    slow_rate: float = 0.0
+    slow_latency: float = 5.0
+    rng: random.Random = field(default_factory=lambda: random.Random(11))
+
+
+def _user_prompt(messages: list[ModelMessage]) -> str:
+    for message in reversed(messages):
+        if isinstance(message, ModelRequest):
+            for part in message.parts:
+                if isinstance(part, UserPromptPart) and isinstance(part.content, str):
+                    return part.content
+    return ""
+
+
+def _plan(messages: list[ModelMessage], info: AgentInfo) -> tuple[str | None, str, str]:
+    """Decide what a well-behaved model would do next: (narrative, tool name, JSON args)."""
+    last = messages[-1]
+    result_tool = info.result_tools[0].name if info.result_tools else None
+    tools = {tool.name for tool in info.function_tools}
+    if isinstance(last, ModelRequest) and any(isinstance(p, ToolReturnPart) for p in last.parts):
+        return None, result_tool, '{"answer": "Here is what I found."}'
+
+    prompt = _user_prompt(messages).lower()
+    if "get_booking_by_id" in tools and "booking" in prompt:
+        return None, "get_booking_by_id", "{}"
+    if "get_available_rooms" in tools:
+        return "Here are the rooms we have for you.", "get_available_rooms", "{}"
+    return None, result_tool, '{"answer": "How can I help you?"}'
+
+
+def fake_gemini(
+    latency: float = 0.5, chunk_latency: float = 0.02, faults: Faults | None = None
+) -> tuple[FunctionModel, ModelStats]:
+    """Build a model that answers after `latency` seconds and streams in small chunks."""
+    stats = ModelStats()
+    faults = faults or Faults()
+
+    async def call_model() -> None:
+        stats.calls += 1
+        await asyncio.sleep(latency)
+        if faults.slow_rate and faults.rng.random() < faults.slow_rate:
+            stats.slow += 1
+            await asyncio.sleep(faults.slow_latency)
+        if faults.error_rate and faults.rng.random() < faults.error_rate:
+            stats.errors += 1
+            raise ModelHTTPError(503, "fake-gemini", {"error": "injected fault"})
+
+    async def respond(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        await call_model()
+        narrative, tool_name, args = _plan(messages, info)
+        parts = [TextPart(narrative)] if narrative else []
+        return ModelResponse(parts=[*parts, ToolCallPart(tool_name, args)])
+
+    async def stream(messages: list[ModelMessage], info: AgentInfo) -> AsyncIterator[str | dict[int, DeltaToolCall]]:
+        await call_model()
+        narrative, tool_name, args = _plan(messages, info)
+        if narrative:
+            yield narrative
+        yield {0: DeltaToolCall(name=tool_name)}
+        for start in range(0, len(args), 16):
+            await asyncio.sleep(chunk_latency)
+            yield {0: DeltaToolCall(json_args=args[start:start + 16])}
+
+    return FunctionModel(respond, stream_function=stream), stats
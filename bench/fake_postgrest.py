@@ -0,0 +1,194 @@
+"""Local PostgREST stand-in seeded with synthetic `rooms` and `bookings`.
+
+Implements just enough of the PostgREST query syntax for this app: column
+projection, `eq/neq/gt/gte/lt/lte/in` filters, `order`, `limit`, single-object
+responses and inserts. Every request is counted per table so benchmarks can
+report DB calls per request.
+
+Faults can be injected (and changed while the server runs): `error_rate` of
+requests fail with a 503, `slow_rate` of them take `slow_latency` extra seconds.
+"""
+
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import date, timedelta
+from typing import Any
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+ROOM_TYPES = ["Standard", "Deluxe", "Family", "Suite"]
+BOOKING_STATUSES = ["Confirmed", "Pending", "Completed", "Cancelled"]
+
+
+def seed(rooms: int = 50, bookings: int = 500, rng: random.Random | None = None) -> dict[str, list[dict[str, Any]]]:
+    rng = rng or random.Random(42)
+    room_rows = [
+        {
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "room_number": str(100 + i),
+            "room_type": (room_type := rng.choice(ROOM_TYPES)),
+            "description": f"{room_type} room on floor {1 + i // 10}",
+            "max_guests": rng.randint(1, 6),
+            "price_per_night": float(rng.randrange(1500, 9000, 50)),
+            "status": rng.choice(["Available", "Available", "Available", "Occupied"]),
+        }
+        for i in range(rooms)
+    ]
+    today = date.today()
+    booking_rows = []
+    for i in range(bookings):
+        room = rng.choice(room_rows)
+        check_in = today + timedelta(days=rng.randint(-60, 120))
+        nights = rng.randint(1, 7)
+        booking_rows.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "room_id": room["id"],
+            "guest_name": f"Guest {i}",
+            "guest_email": f"guest{i % (bookings // 3 or 1)}@example.com",
+            "guest_phone": f"0917{i:07d}",
+            "check_in_date": check_in.isoformat(),
+            "check_out_date": (check_in + timedelta(days=nights)).isoformat(),
+            "number_of_guests": rng.randint(1, room["max_guests"]),
+            "total_price": room["price_per_night"] * nights,
+            "status": rng.choice(BOOKING_STATUSES),
+            "payment_method": rng.choice(["eCash", "Card", "Cash"]),
+            "reference_number": f"BK{10000 + i}",
+            "created_at": f"{today.isoformat()}T00:00:00+00:00",
+            "updated_at": f"{today.isoformat()}T00:00:00+00:00",
+        })
+    return {"rooms": room_rows, "bookings": booking_rows, "conversations": []}
+
+
+def _parse_value(raw: str) -> Any:
+    return raw.strip('"')
+
+
+def _matches(row: dict[str, Any], column: str, expression: str) -> bool:
+    operator, _, raw = expression.partition(".")
+    value = row.get(column)
+    if operator == "in":
+        return str(value) in {_parse_value(v) for v in raw.strip("()").split(",")}
+    if operator == "is":
+        return value is None if raw == "null" else str(value).lower() == raw
+    if value is None:
+        return False
+    comparable = type(value)(raw) if isinstance(value, (int, float)) else raw
+    return {
+        "eq": value == comparable,
+        "neq": value != comparable,
+        "gt": value > comparable,
+        "gte": value >= comparable,
+        "lt": value < comparable,
+        "lte": value <= comparable,
+    }[operator]
+
+
+class FakePostgREST:
+    def __init__(
+        self,
+        tables: dict[str, list[dict[str, Any]]] | None = None,
+        latency: float = 0.0,
+        *,
+        error_rate: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_latency: float = 2.0,
+        rng: random.Random | None = None,
+    ):
+        self.tables = tables or seed()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.rng = rng or random.Random(7)
+        self.calls: Counter[str] = Counter()
+        self.faults: Counter[str] = Counter()
+        self.app = Starlette(routes=[Route("/rest/v1/{table}", self.handle, methods=["GET", "POST"])])
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    async def handle(self, request: Request) -> Response:
+        table = request.path_params["table"]
+        self.calls[table] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.slow_rate and self.rng.random() < self.slow_rate:
+            self.faults["slow"] += 1
+            await asyncio.sleep(self.slow_latency)
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.faults["error"] += 1
+            return JSONResponse({"message": "injected fault"}, 503)
+        rows = self.tables.setdefault(table, [])
+
+        if request.method == "POST":
+            payload = json.loads(await request.body())
+            rows.extend(payload if isinstance(payload, list) else [payload])
+            return Response(status_code=201)
+
+        select = "*"
+        order = None
+        limit = None
+        for column, expression in request.query_params.multi_items():
+            if column == "select":
+                select = expression
+            elif column == "order":
+                order = expression
+            elif column == "limit":
+                limit = int(expression)
+            else:
+                rows = [row for row in rows if _matches(row, column, expression)]
+
+        if order:
+            for key in reversed(order.split(",")):
+                column, _, direction = key.partition(".")
+                rows = sorted(rows, key=lambda row: row.get(column), reverse=direction.startswith("desc"))
+        if limit is not None:
+            rows = rows[:limit]
+        if select != "*":
+            columns = [c.strip() for c in select.split(",")]
+            rows = [{c: row.get(c) for c in columns} for row in rows]
+
+        if "vnd.pgrst.object" in request.headers.get("accept", ""):
+            if len(rows) != 1:
+                return JSONResponse({"message": "JSON object requested, multiple (or no) rows returned"}, 406)
+            return JSONResponse(rows[0])
+        return JSONResponse(rows)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class BackgroundServer:
+    """Run an ASGI app under uvicorn on its own thread and event loop."""
+
+    def __init__(self, app, port: int | None = None, lifespan: str = "auto"):
+        self.port = port or free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning", lifespan=lifespan)
+        )
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self) -> "BackgroundServer":
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *_):
+        self.server.should_exit = True
+        self.thread.join()
@@ -0,0 +1,64 @@
+"""Intent classifier benchmark: held-out accuracy, training time and prediction latency.
+
+Runs k-fold cross-validation over the seed examples (plus INTENT_TRAINING_PATH, if set)
+and reports overall accuracy, how many held-out questions would have been answered
+locally at the routing threshold and how many of those were misrouted, then times
+`predict` on a single question.
+
+Usage (from the repo root):
+    python bench/intent_bench.py [--folds 5] [--threshold 0.8]
+"""
+
+import sys
+import random
+import argparse
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from intent_router import INTENT_CONFIDENCE, OTHER, IntentClassifier, training_examples  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=INTENT_CONFIDENCE)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    questions, labels = training_examples()
+    order = list(range(len(questions)))
+    random.Random(args.seed).shuffle(order)
+
+    correct = routed = misrouted = 0
+    for fold in range(args.folds):
+        held_out = set(order[fold::args.folds])
+        train = [i for i in order if i not in held_out]
+        classifier = IntentClassifier().fit([questions[i] for i in train], [labels[i] for i in train])
+        for i in held_out:
+            intent, confidence = classifier.predict(questions[i])
+            correct += intent == labels[i]
+            if intent != OTHER and confidence >= args.threshold:
+                routed += 1
+                misrouted += intent != labels[i]
+
+    start = time.perf_counter()
+    classifier = IntentClassifier().fit(questions, labels)
+    fit_ms = (time.perf_counter() - start) * 1000
+    runs = 10_000
+    start = time.perf_counter()
+    for _ in range(runs):
+        classifier.predict("how many guests fit in room 101")
+    predict_us = (time.perf_counter() - start) / runs * 1e6
+
+    print(f"examples:    {len(questions)} ({len(set(labels))} intents, {len(classifier.vocabulary)} terms)")
+    print(f"accuracy:    {correct / len(questions):.1%} held out ({args.folds}-fold)")
+    print(f"routed:      {routed} of {len(questions)} at p >= {args.threshold}, {misrouted} misrouted")
+    print(f"fit:         {fit_ms:.1f} ms")
+    print(f"predict:     {predict_us:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""Load test for the FastHTML chat endpoints with local model and database stand-ins.
+
+Starts a fake PostgREST server seeded with synthetic rooms and bookings, swaps the
+shared Gemini model for a FunctionModel with artificial latency, serves main.app under
+uvicorn and drives it at the requested concurrency. Nothing leaves the machine.
+
+The load generator runs in its own process, so the client's work doesn't compete with
+the app for the GIL and inflate the latencies it measures.
+
+Usage (from the repo root):
+    python bench/load_test.py --requests 500 --concurrency 50 \\
+        --mix inquiry=0.6,booking_id=0.3,booking_question=0.1 --model-latency 0.5
+
+Reports p50/p95/p99 latency (time to first byte and to full response), requests/sec,
+and database and model calls per request.
+"""
+
+import os
+import sys
+import asyncio
+import argparse
+import logging
+import multiprocessing
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT / "bench")]
+
+from fake_model import Faults, fake_gemini  # noqa: E402
+from fake_postgrest import BackgroundServer, FakePostgREST, seed  # noqa: E402
+
+INQUIRIES = [
+    "show the cheapest rooms?",
+    "what rooms are available",
+    "cheapest room",
+    "do you have family rooms?",
+    "what is the most expensive room",
+    "rooms for 4 guests",
+    "any suites available this weekend?",
+]
+BOOKING_QUESTIONS = [
+    "what is the status of my booking?",
+    "when is my booking check-out?",
+]
+
+
+@dataclass
+class Results:
+    ttfb: list[float] = field(default_factory=list)
+    total: list[float] = field(default_factory=list)
+    errors: int = 0
+    by_scenario: dict[str, int] = field(default_factory=dict)
+
+
+def parse_mix(raw: str) -> dict[str, float]:
+    mix = {}
+    for item in raw.split(","):
+        name, _, weight = item.partition("=")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+def build_request(scenario: str, bookings: list[dict], rng: random.Random) -> tuple[str, dict[str, str]]:
+    if scenario == "inquiry":
+        return "/api/inquire", {"question": rng.choice(INQUIRIES)}
+    if scenario == "booking_id":
+        booking = rng.choice(bookings)
+        key = booking["id"] if rng.random() < 0.5 else booking["reference_number"]
+        return "/api/get_booking", {"booking_id": key}
+    if scenario == "booking_question":
+        return "/api/get_booking", {"booking_id": rng.choice(BOOKING_QUESTIONS)}
+    raise ValueError(f"Unknown scenario {scenario!r}")
+
+
+async def drive(base_url: str, args, bookings: list[dict]) -> tuple[Results, float]:
+    mix = parse_mix(args.mix)
+    scenarios, weights = list(mix), list(mix.values())
+    rng = random.Random(args.seed)
+    plan = [rng.choices(scenarios, weights)[0] for _ in range(args.requests)]
+    results = Results()
+    queue: asyncio.Queue[str] = asyncio.Queue()
+    for scenario in plan:
+        queue.put_nowait(scenario)
+
+    # One connection pool for every visitor: building an AsyncClient's own transport loads
+    # TLS certificates, which takes tens of milliseconds of CPU per visitor.
+    transport = httpx.AsyncHTTPTransport(limits=httpx.Limits(max_connections=args.concurrency))
+
+    async def visitor():
+        # Each visitor keeps its cookies (and therefore its chat session) for `turns` requests.
+        while not queue.empty():
+            # Not closed per visitor, since closing a client closes the shared transport.
+            client = httpx.AsyncClient(base_url=base_url, timeout=args.timeout, transport=transport, trust_env=False)
+            for _ in range(args.turns):
+                if queue.empty():
+                    return
+                scenario = queue.get_nowait()
+                path, params = build_request(scenario, bookings, rng)
+                start = time.perf_counter()
+                try:
+                    async with client.stream("GET", path, params=params) as response:
+                        first_byte = None
+                        async for _ in response.aiter_bytes():
+                            first_byte = first_byte or time.perf_counter()
+                        response.raise_for_status()
+                except Exception as e:
+                    results.errors += 1
+                    logging.warning(f"⚠️ {scenario} request failed: {e!r}")
+                    continue
+                end = time.perf_counter()
+                results.ttfb.append((first_byte or end) - start)
+                results.total.append(end - start)
+                results.by_scenario[scenario] = results.by_scenario.get(scenario, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(visitor() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    await transport.aclose()
+    return results, elapsed
+
+
+def run_client(base_url: str, args, bookings: list[dict]) -> tuple[Results, float]:
+    """Entry point of the load-generator process."""
+    return asyncio.run(drive(base_url, args, bookings))
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return float("nan")
+    return statistics.quantiles(samples, n=100, method="inclusive")[int(pct) - 1] if len(samples) > 1 else samples[0]
+
+
+def report(results: Results, elapsed: float, db: FakePostgREST, model_calls: int):
+    done = len(results.total)
+    print(f"requests:    {done} ok, {results.errors} errors in {elapsed:.2f}s ({done / elapsed:.1f} req/s)")
+    print(f"scenarios:   {results.by_scenario}")
+    for label, samples in (("ttfb", results.ttfb), ("total", results.total)):
+        p50, p95, p99 = (percentile(samples, p) * 1000 for p in (50, 95, 99))
+        print(f"{label + ' ms:':<12} p50={p50:.1f} p95={p95:.1f} p99={p99:.1f}")
+    per_request = max(done, 1)
+    tables = ", ".join(f"{table}={count / per_request:.2f}" for table, count in sorted(db.calls.items()))
+    print(f"db calls:    {db.total_calls / per_request:.2f}/request ({tables})")
+    print(f"model calls: {model_calls / per_request:.2f}/request")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=1, help="requests per visitor session")
+    parser.add_argument("--mix", default="inquiry=0.6,booking_id=0.3,booking_question=0.1")
+    parser.add_argument("--model-latency", type=float, default=0.5, help="seconds per model call")
+    parser.add_argument("--db-latency", type=float, default=0.02, help="seconds per PostgREST call")
+    parser.add_argument("--rooms", type=int, default=50)
+    parser.add_argument("--bookings", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--db-error-rate", type=float, default=0.0, help="fraction of PostgREST calls failing with 503")
+    parser.add_argument("--db-slow-rate", type=float, default=0.0, help="fraction of PostgREST calls delayed by --slow-latency")
+    parser.add_argument("--model-error-rate", type=float, default=0.0, help="fraction of model calls failing with 503")
+    parser.add_argument("--model-slow-rate", type=float, default=0.0, help="fraction of model calls delayed by --slow-latency")
+    parser.add_argument("--slow-latency", type=float, default=2.0)
+    parser.add_argument("--no-cache", action="store_true", help="disable the rooms and response caches")
+    parser.add_argument(
+        "--admission", action="store_true", help="keep the app's rate limits and model concurrency cap (off by default)"
+    )
+    args = parser.parse_args()
+
+    fake_db = FakePostgREST(
+        seed(args.rooms, args.bookings),
+        latency=args.db_latency,
+        error_rate=args.db_error_rate,
+        slow_rate=args.db_slow_rate,
+        slow_latency=args.slow_latency,
+    )
+    with BackgroundServer(fake_db.app) as db_server:
+        # The app reads its Supabase settings at import time, so point it at the fake first.
+        os.environ.update(supa_url=db_server.url, supa_key="bench-key", API_KEY="bench-key")
+        if args.no_cache:
+            os.environ.update(ROOMS_CACHE_TTL="0", RESPONSE_CACHE_SIZE="0")
+        if not args.admission:
+            # Every simulated visitor shares one IP, so per-IP limits would otherwise dominate the results.
+            os.environ.update(
+                RATE_LIMIT_IP_PER_MIN="1e9", RATE_LIMIT_IP_BURST="1000000",
+                RATE_LIMIT_SESSION_PER_MIN="1e9", RATE_LIMIT_SESSION_BURST="1000000",
+                MODEL_CONCURRENCY="1000000",
+            )
+        import main as webapp
+        import registry
+        from telemetry import RESILIENCE_EVENTS
+
+        logging.getLogger().setLevel(logging.WARNING)
+        faults = Faults(error_rate=args.model_error_rate, slow_rate=args.model_slow_rate, slow_latency=args.slow_latency)
+        model, model_stats = fake_gemini(args.model_latency, faults=faults)
+        with registry.override("gemini_model", model), BackgroundServer(webapp.app, lifespan="on") as web:
+            with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as client:
+                # Start the client process before resetting the counters, so its startup isn't timed or counted.
+                client.submit(int).result()
+                fake_db.calls.clear()
+                results, elapsed = client.submit(run_client, web.url, args, fake_db.tables["bookings"]).result()
+    report(results, elapsed, fake_db, model_stats.calls)
+    if fake_db.faults or model_stats.errors or model_stats.slow:
+        print(f"faults:      db {dict(fake_db.faults)}, model errors={model_stats.errors} slow={model_stats.slow}")
+    for line in RESILIENCE_EVENTS.render()[2:]:
+        print(f"resilience:  {line}")
+
+
+if __name__ == "__main__":
+    main()
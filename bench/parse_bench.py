@@ -0,0 +1,72 @@
+"""Row parsing benchmark: per-row model construction vs. parsing.parse_rows.
+
+Builds synthetic room and booking result sets shaped like the rows Supabase returns
+(see fake_postgrest.seed) and times turning them into the models main.py and
+booking.py hand to the agent:
+
+  per-row      `Model(**row)` in a Python loop (main.py, inquire.py before)
+  field-copy   `Model(**{key: row.get(key) for key in Model.model_fields})` (booking.py before)
+  adapter      parse_rows(Model, rows): one TypeAdapter(list[Model]) validation call
+  construct    `Model.model_construct(**row)`: trusted rows, no validation
+  json.loads   decoding the same rows from the JSON body, for scale
+
+Usage (from the repo root):
+    python bench/parse_bench.py [--rows 10000] [--runs 7]
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT / "bench")]
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from booking import BookingData  # noqa: E402
+from fake_postgrest import seed  # noqa: E402
+from main import RoomData  # noqa: E402
+from parsing import parse_rows  # noqa: E402
+
+
+def timed(fn, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    tables = seed(rooms=args.rows, bookings=args.rows, rng=random.Random(1))
+    for model, rows in ((RoomData, tables["rooms"]), (BookingData, tables["bookings"])):
+        body = json.dumps(rows)
+        strategies = {
+            "per-row": lambda: [model(**row) for row in rows],
+            "field-copy": lambda: [model(**{key: row.get(key) for key in model.model_fields}) for row in rows],
+            "adapter": lambda: parse_rows(model, rows),
+            "construct": lambda: [model.model_construct(**row) for row in rows],
+            "json.loads": lambda: json.loads(body),
+        }
+
+        print(f"\n{model.__name__}: {len(rows)} rows, {len(body) / 1e6:.1f} MB of JSON")
+        print(f"{'strategy':<12} {'ms':>9} {'us/row':>8} {'vs per-row':>11}")
+        baseline = None
+        for name, fn in strategies.items():
+            ms = timed(fn, args.runs)
+            baseline = baseline or ms
+            print(f"{name:<12} {ms:>9.1f} {ms * 1000 / len(rows):>8.2f} {baseline / ms:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
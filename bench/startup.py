@@ -0,0 +1,55 @@
+"""Startup-time benchmark: import cost with lazy initialization vs. eager initialization.
+
+"eager" imports the module and then calls `registry.warm_up()`, which builds the
+Gemini model and the Supabase client exactly like the old import-time code did.
+"lazy" only imports the module. Each sample runs in a fresh interpreter.
+
+Usage (from the repo root):
+    python bench/startup.py [--runs 10] [--modules main booking inquire]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SNIPPET = """
+import time
+start = time.perf_counter()
+import {module}
+if {eager}:
+    import registry
+    registry.warm_up()
+print(time.perf_counter() - start)
+"""
+
+
+def sample(module: str, eager: bool) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", SNIPPET.format(module=module, eager=eager)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--modules", nargs="+", default=["main", "booking", "inquire", "orig"])
+    args = parser.parse_args()
+
+    print(f"{'module':<12} {'eager (ms)':>12} {'lazy (ms)':>12} {'saved':>8}")
+    for module in args.modules:
+        eager = statistics.median(sample(module, True) for _ in range(args.runs)) * 1000
+        lazy = statistics.median(sample(module, False) for _ in range(args.runs)) * 1000
+        print(f"{module:<12} {eager:>12.1f} {lazy:>12.1f} {(1 - lazy / eager):>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import os
+from collections.abc import Sequence
+from typing import Any
+
+from booking_lookup import BOOKING_UUID_RE
+from dataloader import DataLoader
+from repository import get_repository
+
+# ✅ Coalescing settings: lookups from concurrent sessions arriving within the window share one query
+BOOKING_BATCH_WINDOW = float(os.getenv("BOOKING_BATCH_WINDOW_MS", "2")) / 1000
+BOOKING_BATCH_SIZE = int(os.getenv("BOOKING_BATCH_SIZE", "100"))
+
+
+async def load_bookings(booking_ids: Sequence[str]) -> dict[str, dict[str, Any]]:
+    # A malformed UUID would make Postgres reject the whole `in` filter, so those never leave the process.
+    valid = [booking_id for booking_id in booking_ids if BOOKING_UUID_RE.fullmatch(booking_id)]
+    if not valid:
+        return {}
+    return {row["id"]: row for row in await get_repository().get_bookings(valid)}
+
+
+async def load_bookings_by_reference(reference_numbers: Sequence[str]) -> dict[str, dict[str, Any]]:
+    rows = await get_repository().get_bookings_by_reference(list(reference_numbers))
+    return {row["reference_number"]: row for row in rows}
+
+
+booking_loader = DataLoader(load_bookings, max_batch_size=BOOKING_BATCH_SIZE, batch_window=BOOKING_BATCH_WINDOW)
+reference_loader = DataLoader(
+    load_bookings_by_reference, max_batch_size=BOOKING_BATCH_SIZE, batch_window=BOOKING_BATCH_WINDOW
+)
+
+
+async def get_booking(booking_id: str) -> dict[str, Any] | None:
+    """The booking with this id, fetched in one `in` query together with concurrent lookups.
+
+    The returned row is shared between callers and must not be mutated.
+    """
+    return await booking_loader.load(booking_id.strip().lower())
+
+
+async def get_booking_by_reference(reference_number: str) -> dict[str, Any] | None:
+    return await reference_loader.load(reference_number.strip())
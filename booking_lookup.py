@@ -0,0 +1,24 @@
+import re
+
+# Booking IDs are Postgres UUIDs; reference numbers follow the "BK12345" format used by the booking UI.
+BOOKING_UUID_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.IGNORECASE)
+REFERENCE_NUMBER_RE = re.compile(r"BK-?\d{5,}", re.IGNORECASE)
+
+
+def match_booking_key(text: str) -> tuple[str, str] | None:
+    """Return the `(column, value)` to look up if `text` is nothing but a booking ID or reference number.
+
+    Anything else is treated as a free-form question and returns None.
+    """
+    text = text.strip()
+    if BOOKING_UUID_RE.fullmatch(text):
+        return "id", text.lower()
+    if REFERENCE_NUMBER_RE.fullmatch(text):
+        return "reference_number", text.upper()
+    return None
+
+
+def extract_booking_id(text: str) -> str | None:
+    """Find the first booking UUID mentioned anywhere in a free-form question."""
+    match = BOOKING_UUID_RE.search(text)
+    return match.group(0).lower() if match else None
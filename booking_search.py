@@ -0,0 +1,75 @@
+import os
+import asyncio
+from datetime import date
+from typing import Any
+
+from pydantic import BaseModel
+
+from repository import get_repository
+
+# ✅ Search settings
+BOOKING_SEARCH_PAGE_SIZE = int(os.getenv("BOOKING_SEARCH_PAGE_SIZE", "10"))
+# Hard cap on rows per page, whatever the caller (or the model) asks for
+BOOKING_SEARCH_MAX_ROWS = int(os.getenv("BOOKING_SEARCH_MAX_ROWS", "50"))
+
+
+class BookingFilter(BaseModel):
+    """Typed booking search filters; every filter that is set must match."""
+
+    check_in_from: date | None = None
+    check_in_to: date | None = None
+    guest_email: str | None = None
+    status: str | None = None
+    reference_number: str | None = None
+
+
+class BookingPage(BaseModel):
+    bookings: list[dict[str, Any]]
+    next_cursor: str | None = None
+
+
+def encode_cursor(row: dict[str, Any]) -> str:
+    return f"{row['check_in_date']}|{row['id']}"
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    check_in_date, _, booking_id = cursor.partition("|")
+    # Validate both halves so a cursor can't smuggle extra PostgREST syntax into the filter.
+    date.fromisoformat(check_in_date)
+    if not booking_id.replace("-", "").isalnum():
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return check_in_date, booking_id
+
+
+async def _search(filters: BookingFilter, limit: int, cursor: str | None) -> BookingPage:
+    # Fetch one extra row to know whether there is a next page.
+    rows = await get_repository().search_bookings(
+        **filters.model_dump(),
+        after=decode_cursor(cursor) if cursor else None,
+        limit=limit + 1,
+    )
+    if len(rows) > limit:
+        return BookingPage(bookings=rows[:limit], next_cursor=encode_cursor(rows[limit - 1]))
+    return BookingPage(bookings=rows)
+
+
+async def search_bookings(
+    filters: BookingFilter,
+    *,
+    limit: int = BOOKING_SEARCH_PAGE_SIZE,
+    cursor: str | None = None,
+    memo: dict | None = None,
+) -> BookingPage:
+    """One page of bookings matching `filters`.
+
+    Pass the same `memo` dict for the whole agent run so tools that chain (or run in
+    parallel) share one query per distinct search instead of re-querying.
+    """
+    limit = max(1, min(limit, BOOKING_SEARCH_MAX_ROWS))
+    if memo is None:
+        return await _search(filters, limit, cursor)
+
+    key = (filters.model_dump_json(), limit, cursor)
+    if key not in memo:
+        memo[key] = asyncio.ensure_future(_search(filters, limit, cursor))
+    return await asyncio.shield(memo[key])
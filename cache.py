@@ -0,0 +1,94 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+class AsyncTTLCache:
+    """In-process async cache with per-entry TTL and single-flight fetching.
+
+    Concurrent misses for the same key share one in-flight fetch instead of each
+    hitting the backend. `invalidate()` drops entries immediately and prevents any
+    fetch that started before the invalidation from repopulating the cache.
+
+    With `stale_ttl`, an expired entry is kept that much longer and served if a
+    refresh fails, so callers get slightly old data instead of an error while the
+    backend is down.
+
+    A caller cancelled while waiting (say, a client that disconnected) stops waiting
+    without cancelling the shared fetch.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float = 0):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.stale = 0
+        self._entries: dict[Hashable, tuple[float, Any]] = {}
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self._generation = 0
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            # The fetch runs as its own task, so a caller that is cancelled (e.g. a client
+            # disconnecting) only stops waiting; the fetch carries on for everyone else.
+            task = asyncio.ensure_future(self._fetch(key, fetch, entry))
+            task.add_done_callback(_retrieve_exception)
+            self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]], entry: tuple[float, Any] | None) -> Any:
+        generation = self._generation
+        try:
+            value = await fetch()
+        except Exception:
+            if entry is not None and entry[0] + self.stale_ttl > time.monotonic():
+                self.stale += 1
+                return entry[1]
+            raise
+        else:
+            if generation == self._generation:
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def peek(self, key: Hashable) -> Any:
+        """The cached value for `key`, expired or not, without fetching; None if there is none."""
+        entry = self._entries.get(key)
+        return entry[1] if entry is not None else None
+
+    def invalidate(self, key: Hashable | None = None) -> None:
+        """Drop one entry, or every entry when `key` is None."""
+        self._generation += 1
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "stale": self.stale,
+            "size": len(self._entries),
+            "inflight": len(self._inflight),
+        }
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    # Mark the exception as retrieved so a fetch nobody waited on to the end doesn't log a warning.
+    if not task.cancelled():
+        task.exception()
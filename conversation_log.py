@@ -0,0 +1,171 @@
+import os
+import json
+import asyncio
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, List, Optional
+
+from pydantic import BaseModel, Field
+from pydantic_ai.agent import AgentRunResult
+
+from log_config import sampled
+from repository import get_repository
+
+# ✅ Sink settings
+CONVERSATION_BATCH_SIZE = int(os.getenv("CONVERSATION_BATCH_SIZE", "50"))
+CONVERSATION_FLUSH_MS = int(os.getenv("CONVERSATION_FLUSH_MS", "500"))
+CONVERSATION_INSERT_TIMEOUT = float(os.getenv("CONVERSATION_INSERT_TIMEOUT", "2"))
+CONVERSATION_QUEUE_SIZE = int(os.getenv("CONVERSATION_QUEUE_SIZE", "10000"))
+CONVERSATION_SPILL_PATH = Path(os.getenv("CONVERSATION_SPILL_PATH", "conversations_spill.jsonl"))
+
+
+# --- Pydantic Models for Conversation History ---
+
+class ConversationMessage(BaseModel):
+    role: str = Field(..., description="The role of the message, e.g., 'system', 'user', or 'assistant'.")
+    content: str = Field(..., description="The text content of the message.")
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), description="Timestamp of the message.")
+
+    model_config = {
+        "json_encoders": {
+            datetime: lambda v: v.isoformat()
+        }
+    }
+
+class Conversation(BaseModel):
+    query: str
+    response: str
+    messages: Optional[List[ConversationMessage]] = Field(default_factory=list)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    model_config = {
+        "json_encoders": {
+            datetime: lambda v: v.isoformat()
+        }
+    }
+
+
+def conversation_from_run(query: str, result: AgentRunResult, created_at: datetime | None = None) -> Conversation:
+    """Flatten an agent run into the row stored in the `conversations` table."""
+    messages = [
+        ConversationMessage(
+            role=getattr(msg, "kind", "unknown"),
+            content=getattr(msg, "content", str(msg)),
+            timestamp=getattr(msg, "timestamp", datetime.now(timezone.utc))
+        )
+        for msg in result.all_messages()
+    ]
+    return Conversation(
+        query=query,
+        response=str(result.data),
+        messages=messages,
+        created_at=created_at or datetime.now(timezone.utc),
+    )
+
+
+class ConversationSink:
+    """Background writer that batches completed agent runs into the `conversations` table.
+
+    `record()` only enqueues, so logging never adds latency to a response; if the queue
+    is full (the writer is far behind), the run is counted in `dropped` and not logged. A
+    background task bulk-inserts every `batch_size` rows or `flush_ms` milliseconds,
+    whichever comes first. Batches that fail or take longer than `insert_timeout` seconds
+    are appended to a local JSONL spill file instead of being dropped.
+
+    Delivery is at-least-once: a batch that timed out may still have committed on the
+    server, so replaying the spill file can store some conversations twice. Rows in a
+    batch that timed out are logged as such; de-duplicate on (query, created_at) when replaying.
+    """
+
+    def __init__(
+        self,
+        *,
+        batch_size: int = CONVERSATION_BATCH_SIZE,
+        flush_ms: int = CONVERSATION_FLUSH_MS,
+        insert_timeout: float = CONVERSATION_INSERT_TIMEOUT,
+        queue_size: int = CONVERSATION_QUEUE_SIZE,
+        spill_path: Path = CONVERSATION_SPILL_PATH,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_ms / 1000
+        self.insert_timeout = insert_timeout
+        self.spill_path = spill_path
+        self.inserted = 0
+        self.spilled = 0
+        self.dropped = 0
+        self._queue: asyncio.Queue[tuple[str, AgentRunResult, datetime]] = asyncio.Queue(maxsize=queue_size)
+        self._task: asyncio.Task | None = None
+        self._pending: list[tuple[str, AgentRunResult, datetime]] = []
+        self._flushing: asyncio.Future | None = None
+
+    def record(self, query: str, result: AgentRunResult) -> None:
+        """Queue a completed run. Never blocks; rows are converted in the background."""
+        try:
+            self._queue.put_nowait((query, result, datetime.now(timezone.utc)))
+        except asyncio.QueueFull:
+            # Converting and writing the row here would put that work on the request; drop it instead.
+            self.dropped += 1
+            logging.warning("⚠️ Conversation queue full, dropped a conversation (%d so far).", self.dropped, extra=sampled())
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="conversation-sink")
+
+    async def stop(self) -> None:
+        """Stop the background task and flush everything still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flushing is not None:
+            await self._flushing
+        pending, self._pending = self._pending, []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for start in range(0, len(pending), self.batch_size):
+            await self._flush(pending[start:start + self.batch_size])
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            # Rows collected so far live on `self._pending` so stop() can flush them if we are cancelled.
+            self._pending.append(await self._queue.get())
+            deadline = loop.time() + self.flush_interval
+            while len(self._pending) < self.batch_size and (remaining := deadline - loop.time()) > 0:
+                try:
+                    self._pending.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            batch, self._pending = self._pending, []
+            self._flushing = asyncio.ensure_future(self._flush(batch))
+            await asyncio.shield(self._flushing)
+            self._flushing = None
+
+    async def _flush(self, batch: list[tuple[str, AgentRunResult, datetime]]) -> None:
+        rows = [self._to_row(item) for item in batch]
+        try:
+            await asyncio.wait_for(get_repository().insert_conversations(rows), self.insert_timeout)
+            self.inserted += len(rows)
+            logging.info(f"💾 Stored {len(rows)} conversations.")
+        except asyncio.TimeoutError:
+            logging.error("❌ Storing %d conversations timed out, spilling to disk (they may already be stored).", len(rows))
+            await asyncio.to_thread(self._spill, rows)
+        except Exception as e:
+            logging.error("❌ Failed to store %d conversations, spilling to disk: %r", len(rows), e)
+            await asyncio.to_thread(self._spill, rows)
+
+    def _to_row(self, item: tuple[str, AgentRunResult, datetime]) -> dict[str, Any]:
+        query, result, created_at = item
+        return conversation_from_run(query, result, created_at).model_dump(mode="json")
+
+    def _spill(self, rows: list[dict[str, Any]]) -> None:
+        with self.spill_path.open("a", encoding="utf-8") as f:
+            f.writelines(json.dumps(row) + "\n" for row in rows)
+        self.spilled += len(rows)
+
+
+conversation_sink = ConversationSink()
@@ -0,0 +1,78 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Hashable, Sequence
+from typing import Any
+
+
+class DataLoader:
+    """Batch and dedupe concurrent loads by key.
+
+    Every `load(key)` made in the same event-loop tick (or within `batch_window`
+    seconds of the first one, if set) is collected into one call of
+    `batch_fn(keys)`, which returns a mapping from key to value (missing keys load as
+    None). A key that is already being fetched shares the in-flight result instead of
+    being requested again. Nothing is kept once a batch resolves; cache on top if needed.
+    """
+
+    def __init__(self, batch_fn: Callable[[Sequence[Hashable]], Awaitable[dict[Hashable, Any]]], max_batch_size: int = 100, batch_window: float = 0.0):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window
+        self.batches = 0
+        self.loads = 0
+        self._pending: dict[Hashable, asyncio.Future] = {}
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self._scheduled = False
+
+    async def load(self, key: Hashable) -> Any:
+        self.loads += 1
+        future = self._inflight.get(key) or self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending[key] = loop.create_future()
+            if not self._scheduled:
+                self._scheduled = True
+                if self.batch_window > 0:
+                    loop.call_later(self.batch_window, self._dispatch)
+                else:
+                    loop.call_soon(self._dispatch)
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Sequence[Hashable]) -> list[Any]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _dispatch(self) -> None:
+        self._scheduled = False
+        pending, self._pending = self._pending, {}
+        keys = list(pending)
+        for start in range(0, len(keys), self.max_batch_size):
+            batch = {key: pending[key] for key in keys[start:start + self.max_batch_size]}
+            self._inflight.update(batch)
+            asyncio.ensure_future(self._run_batch(batch))
+
+    async def _run_batch(self, batch: dict[Hashable, asyncio.Future]) -> None:
+        self.batches += 1
+        try:
+            values = await self.batch_fn(list(batch))
+        except Exception as e:
+            logging.error(f"❌ Batch load of {len(batch)} keys failed: {e!r}")
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+                    # Mark as retrieved so a load nobody awaits any more doesn't log a warning.
+                    future.exception()
+        else:
+            for key, future in batch.items():
+                if not future.done():
+                    future.set_result(values.get(key))
+        finally:
+            for key in batch:
+                self._inflight.pop(key, None)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "loads": self.loads,
+            "batches": self.batches,
+            "pending": len(self._pending),
+            "inflight": len(self._inflight),
+        }
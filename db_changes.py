@@ -0,0 +1,83 @@
+import os
+import hmac
+import logging
+from datetime import date
+from typing import Any
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+import availability
+from rooms import invalidate_rooms
+
+# ✅ Database change webhook settings
+# Secret Supabase's database webhook sends in the X-Webhook-Secret header; the endpoint is off while unset
+DB_WEBHOOK_SECRET = os.getenv("DB_WEBHOOK_SECRET")
+WATCHED_TABLES = frozenset({"rooms", "bookings"})
+
+
+def _valid_booking(record: Any) -> bool:
+    """Whether `record` has what the occupancy index reads: an id and, for a booking holding a room, its dates."""
+    if not isinstance(record, dict) or record.get("id") is None:
+        return False
+    if record.get("room_id") is None:
+        return True
+    for key in ("check_in_date", "check_out_date"):
+        value = record.get(key)
+        if not isinstance(value, (str, date)):
+            return False
+        try:
+            availability._to_date(value)
+        except ValueError:
+            return False
+    return True
+
+
+def apply_change(change: dict[str, Any]) -> bool:
+    """Bring the in-process room and occupancy data up to date with a row change in `rooms` or `bookings`.
+
+    `change` is a Supabase database webhook payload: `type` (INSERT, UPDATE or DELETE),
+    `table`, `record` and `old_record`. Returns False when a booking row is malformed;
+    the occupancy index is then rebuilt on the next query instead of being patched.
+    """
+    table = change.get("table")
+    if table not in WATCHED_TABLES:
+        return True
+    # A booking can take a room out of the available list and a status change can put one back.
+    invalidate_rooms()
+    if table == "rooms":
+        availability.invalidate_occupancy()
+        return True
+    deleted = change.get("type") == "DELETE"
+    record = change.get("old_record" if deleted else "record")
+    valid = isinstance(record, dict) and record.get("id") is not None if deleted else _valid_booking(record)
+    if not valid:
+        logging.warning("⚠️ Malformed %s on bookings, rebuilding the occupancy index.", change.get("type"))
+        availability.invalidate_occupancy()
+        return False
+    if deleted:
+        availability.forget_booking(record["id"])
+    else:
+        availability.record_booking(record)
+    return True
+
+
+async def webhook(request: Request) -> Response:
+    """POST endpoint for Supabase database webhooks on the `rooms` and `bookings` tables.
+
+    Bookings are written by other services, so this is how a change reaches the caches.
+    Each call lands on one worker; the others pick the change up when their TTL expires.
+    """
+    secret = request.headers.get("x-webhook-secret", "")
+    if not DB_WEBHOOK_SECRET or not hmac.compare_digest(secret.encode(), DB_WEBHOOK_SECRET.encode()):
+        return Response(status_code=404 if not DB_WEBHOOK_SECRET else 401)
+    try:
+        change = await request.json()
+    except ValueError:
+        return JSONResponse({"error": "Expected a JSON body."}, status_code=400)
+    if not isinstance(change, dict):
+        return JSONResponse({"error": "Expected a JSON object."}, status_code=400)
+    logging.info("🔔 %s on %s", change.get("type"), change.get("table"))
+    if not apply_change(change):
+        return JSONResponse({"error": "Malformed booking record."}, status_code=400)
+    return Response(status_code=204)
@@ -2,35 +2,24 @@ import os
 import asyncio
 import logging
 import nest_asyncio
+from datetime import date
 from dotenv import load_dotenv
-from supabase import create_client, Client
 from pydantic import BaseModel
 from pydantic_ai import Agent, RunContext, Tool
-from pydantic_ai.models.gemini import GeminiModel
-from pydantic_ai.providers.google_gla import GoogleGLAProvider
+
+import availability
+from log_config import configure_logging, sampled
+from parsing import parse_rows
+from registry import LazyModel
+from repository import close_repository
+from rooms import available_rooms
+from telemetry import traced
 
 # ✅ Load environment variables
 load_dotenv()
-nest_asyncio.apply()
 
 # ✅ Set up logging
-logging.basicConfig(
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    level=logging.INFO,
-)
-
-# ✅ Initialize Supabase client
-SUPABASE_URL = os.getenv("supa_url")
-SUPABASE_KEY = os.getenv("supa_key")
-
-def initialize_supabase():
-    if not SUPABASE_URL or not SUPABASE_KEY:
-        logging.critical("❌ Supabase credentials are missing! Check environment variables.")
-        raise ValueError("Supabase credentials are missing!")
-    logging.info("✅ Supabase client initialized successfully.")
-    return create_client(SUPABASE_URL, SUPABASE_KEY)
-
-supabase: Client = initialize_supabase()
+configure_logging()
 
 # ✅ Define Pydantic models
 class InquiryRequest(BaseModel):
@@ -48,45 +37,60 @@ class ResponseModel(BaseModel):
     answer: str
     rooms: list[RoomData] | None = None
 
-# ✅ Initialize AI Agent for General Inquiries
-gem_api = os.getenv("API_KEY")
-model = GeminiModel("gemini-2.0-flash", provider=GoogleGLAProvider(api_key=gem_api))
-
+# ✅ Initialize AI Agent for General Inquiries (the Gemini client is built on first use)
 agent = Agent(
-    model=model,
+    model=LazyModel(),
     result_type=ResponseModel,
     system_prompt=(
         "You are an AI assistant for a business providing information about available rooms and general inquiries. "
         "Use the available tools to retrieve real data instead of generating responses. "
-        "If a user asks about room availability, fetch the data from the database."
+        "If a user asks about room availability, fetch the data from the database. "
+        "If they give travel dates, use find_available_rooms."
     ),
 )
 
+@agent.system_prompt
+def current_date() -> str:
+    return f"Today is {date.today():%A, %B %d, %Y}."
+
 @agent.tool
+@traced("tool")
 async def get_available_rooms(ctx: RunContext[InquiryRequest]) -> ResponseModel:
     """Fetch available rooms from the database."""
-    logging.info(f"🛠️ Fetching available rooms for inquiry: {ctx.deps.question}")
+    logging.info("🛠️ Fetching available rooms", extra=sampled())
 
     try:
-        response = await asyncio.to_thread(
-            lambda: supabase.from_("rooms")
-                .select("room_number, room_type, description, max_guests, status, price_per_night")
-                .eq("status", "Available")
-                .execute()
-        )
+        rows = await available_rooms()
 
-        if not response.data:
+        if not rows:
             logging.warning("⚠️ No available rooms found.")
             return ResponseModel(answer="No available rooms at the moment.", rooms=[])
 
-        logging.info(f"✅ Available rooms found: {len(response.data)}")
-        rooms = [RoomData(**room) for room in response.data]
+        logging.info("✅ Available rooms found: %d", len(rows), extra=sampled())
+        rooms = parse_rows(RoomData, rows)
         return ResponseModel(answer="Here are the available rooms:", rooms=rooms)
 
     except Exception as e:
-        logging.critical(f"❌ Error retrieving room data: {e}", exc_info=True)
+        logging.critical("❌ Error retrieving room data: %s", e, exc_info=True)
         return ResponseModel(answer="An error occurred while retrieving room availability.", rooms=[])
 
+@agent.tool
+@traced("tool")
+async def find_available_rooms(ctx: RunContext[InquiryRequest], check_in: date, check_out: date, guests: int = 1) -> ResponseModel:
+    """Find rooms with none of the nights from check_in up to check_out already booked, for the given number of guests."""
+    logging.info("🛠️ Finding rooms free from %s to %s for %d guests", check_in, check_out, guests, extra=sampled())
+
+    try:
+        rows = await availability.find_available_rooms(check_in, check_out, guests)
+        logging.info("✅ Free rooms found: %d", len(rows), extra=sampled())
+        return ResponseModel(answer=f"Rooms free from {check_in} to {check_out}:", rooms=parse_rows(RoomData, rows))
+
+    except ValueError as e:
+        return ResponseModel(answer=str(e), rooms=[])
+    except Exception as e:
+        logging.critical("❌ Error checking room availability: %s", e, exc_info=True)
+        return ResponseModel(answer="An error occurred while checking room availability.", rooms=[])
+
 # ✅ Run the agent
 async def main():
     user_question = "show the cheapest rooms?"
@@ -108,8 +112,11 @@ async def main():
 
     except Exception as e:
         logging.critical(f"❌ Critical error in main function: {e}", exc_info=True)
+    finally:
+        await close_repository()
 
 if __name__ == "__main__":
+    nest_asyncio.apply()
     logging.info("⚡ Running async main function...")  
     asyncio.run(main())
     logging.info("✅ Script execution completed!")
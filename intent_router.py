@@ -0,0 +1,367 @@
+import os
+import re
+import json
+import math
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+import registry
+from log_config import sampled
+from telemetry import INTENT_ROUTES
+
+# ✅ Routing settings
+INTENT_ROUTING = os.getenv("INTENT_ROUTING", "true").lower() == "true"
+# Questions the classifier is less sure about than this go to the model
+INTENT_CONFIDENCE = float(os.getenv("INTENT_CONFIDENCE", "0.8"))
+# Extra labelled questions, one {"question": ..., "intent": ...} per line (e.g. reviewed from the conversations table)
+INTENT_TRAINING_PATH = os.getenv("INTENT_TRAINING_PATH")
+# Currency that rooms.price_per_night is stored in, used when an answer quotes a price
+PRICE_CURRENCY = os.getenv("PRICE_CURRENCY", "PHP")
+
+# Fallback intent: anything the handlers below can't answer on their own
+OTHER = "other"
+
+SEED_EXAMPLES: dict[str, list[str]] = {
+    "list_rooms": [
+        "list rooms", "show me the rooms", "what rooms are available", "which rooms do you have",
+        "show all available rooms", "what rooms can I book", "do you have any rooms available",
+        "available rooms", "rooms please", "can I see your rooms", "what are my room options",
+        "show me what rooms you have", "list all rooms with prices", "any rooms available",
+        "what kinds of rooms do you offer", "room list", "room options", "show rooms",
+        "what accommodations are available", "what do you have available", "rooms and prices",
+    ],
+    "cheapest_room": [
+        "cheapest room", "show the cheapest rooms", "what is the cheapest room", "lowest price room",
+        "most affordable room", "what's your cheapest option", "least expensive room",
+        "cheapest room available", "which room costs the least", "budget room", "lowest rate",
+        "what is the lowest price per night", "cheapest place to stay", "most budget friendly room",
+        "affordable rooms", "most affordable option", "cheap rooms", "inexpensive room",
+        "lowest cost room", "most economical room", "what's the cheapest", "cheapest price",
+    ],
+    "most_expensive_room": [
+        "most expensive room", "what is the most expensive room", "priciest room", "highest price room",
+        "best and most expensive room", "which room costs the most", "your most luxurious room",
+        "highest rate per night", "top priced room", "what is the highest price", "premium room",
+        "most costly room", "luxury room", "highest priced room", "what's your priciest room",
+        "most expensive suite", "your best room regardless of price", "what's the most expensive",
+    ],
+    "room_capacity": [
+        "how many guests fit in room 101", "how many people can stay in room 204",
+        "what is the capacity of room 12", "max guests for room 305", "how many can sleep in room 101",
+        "room 110 capacity", "how many persons in room 201", "can room 102 fit many people",
+        "how many guests does room 300 hold", "maximum occupancy of room 15",
+    ],
+    "rooms_for_guests": [
+        "rooms for 4 guests", "room for two people", "do you have a room for 5 people",
+        "room that fits 3 guests", "we are a group of 6", "rooms for a family of four",
+        "need a room for 2 adults", "which rooms can fit 4 persons", "room for 3 pax",
+        "accommodation for 8 people", "a room that sleeps 5", "rooms for three guests",
+        "we are 4 people which room", "big room for 6 guests",
+    ],
+    "room_type": [
+        "do you have family rooms", "show me suites", "any deluxe rooms", "do you have a single room",
+        "double rooms please", "what suites do you have", "list the deluxe rooms", "standard rooms",
+        "is there a family room", "show single rooms", "do you offer twin rooms",
+        "what about the suite", "show deluxe", "any standard room available", "any suites",
+        "suite rooms", "twin room", "do you have doubles", "show me double rooms", "family room available",
+    ],
+    OTHER: [
+        "what is the status of my booking", "when is my check out", "cancel my booking",
+        "hello", "hi there", "thank you", "do you have wifi", "is breakfast included",
+        "where are you located", "what time is check in", "can I pay by card",
+        "is parking available", "are pets allowed", "any rooms free this weekend",
+        "rooms available from march 15 to 20", "can I book a room for tomorrow",
+        "is room 101 free next week", "change my reservation dates", "I want a refund",
+        "how do I get there from the airport", "do you have a pool", "who are you",
+        "what is the weather", "my booking reference is BK12345", "i need help",
+        "can I extend my stay", "what are the house rules", "do you allow early check in",
+    ],
+}
+
+TOKEN_RE = re.compile(r"[a-z]+|\d+")
+ROOM_NUMBER_RE = re.compile(r"\broom\s*(?:no\.?|number|#)?\s*(\d+[a-z]?)\b", re.IGNORECASE)
+NUMBER_WORDS = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10}
+GUESTS_RE = re.compile(
+    r"\b(\d+|" + "|".join(NUMBER_WORDS) + r")\s*(?:guests?|people|persons?|pax|adults?|of us)\b"
+    r"|\b(?:family|group) of (\d+|" + "|".join(NUMBER_WORDS) + r")\b"
+    r"|\bsleeps (\d+|" + "|".join(NUMBER_WORDS) + r")\b"
+    r"|\bwe are (\d+|" + "|".join(NUMBER_WORDS) + r")\b",
+    re.IGNORECASE,
+)
+# The price handlers also need the question to say which end of the range it wants
+CHEAP_RE = re.compile(r"cheap|afford|budget|low|least|inexpensive|economical", re.IGNORECASE)
+EXPENSIVE_RE = re.compile(r"expensive|pric(?:ey|iest)|high|luxur|premium|costl|best|\btop\b|\bthe most\b", re.IGNORECASE)
+# Anything date-like needs find_available_rooms and the model's date handling
+DATE_RE = re.compile(
+    r"\b(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|june?|july?|aug(?:ust)?|sept?(?:ember)?|oct(?:ober)?"
+    r"|nov(?:ember)?|dec(?:ember)?|may \d+|(?:mon|tues|wednes|thurs|fri|satur|sun)day)\b"
+    r"|\b(?:today|tonight|tomorrow|weekend|week|month|holidays?|christmas)\b|\d{1,4}[/-]\d{1,2}",
+    re.IGNORECASE,
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased words plus bigrams; numbers become one placeholder so "room 101" and "room 7" look alike."""
+    words = ["<num>" if token.isdigit() else token for token in TOKEN_RE.findall(text.lower())]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class IntentClassifier:
+    """TF-IDF features and a multinomial logistic regression, trained with NumPy.
+
+    Training is a few hundred full-batch gradient steps over the labelled questions and
+    takes milliseconds. Prediction only touches the weight rows of the question's own
+    terms, so it costs microseconds whatever the vocabulary size.
+    """
+
+    def __init__(self, epochs: int = 500, learning_rate: float = 5.0, l2: float = 1e-4):
+        self.epochs = epochs
+        self.learning_rate = learning_rate
+        self.l2 = l2
+        self.vocabulary: dict[str, int] = {}
+        self.labels: list[str] = []
+        self.idf = np.zeros(0)
+        self.weights = np.zeros((0, 0))
+        self.bias = np.zeros(0)
+
+    def fit(self, questions: list[str], labels: list[str]) -> "IntentClassifier":
+        documents = [tokenize(question) for question in questions]
+        self.vocabulary = {term: i for i, term in enumerate(sorted({term for doc in documents for term in doc}))}
+        self.labels = sorted(set(labels))
+        label_index = {label: i for i, label in enumerate(self.labels)}
+
+        counts = np.zeros((len(documents), len(self.vocabulary)))
+        for row, doc in enumerate(documents):
+            for term in doc:
+                counts[row, self.vocabulary[term]] += 1
+        document_frequency = (counts > 0).sum(axis=0)
+        self.idf = np.log((1 + len(documents)) / (1 + document_frequency)) + 1
+        features = self._normalize(counts * self.idf)
+
+        targets = np.zeros((len(documents), len(self.labels)))
+        targets[np.arange(len(documents)), [label_index[label] for label in labels]] = 1
+        self.weights = np.zeros((len(self.vocabulary), len(self.labels)))
+        self.bias = np.zeros(len(self.labels))
+        for _ in range(self.epochs):
+            error = (_softmax(features @ self.weights + self.bias) - targets) / len(documents)
+            self.weights -= self.learning_rate * (features.T @ error + self.l2 * self.weights)
+            self.bias -= self.learning_rate * error.sum(axis=0)
+        return self
+
+    def predict(self, question: str) -> tuple[str, float]:
+        """Most likely intent and its probability."""
+        # Sparse TF-IDF vector: term index -> weight
+        tfidf: dict[int, float] = {}
+        for term in tokenize(question):
+            if (index := self.vocabulary.get(term)) is not None:
+                tfidf[index] = tfidf.get(index, 0.0) + self.idf[index]
+        if not tfidf:
+            return OTHER, 1.0
+        indices = np.fromiter(tfidf, dtype=np.intp, count=len(tfidf))
+        values = np.fromiter(tfidf.values(), dtype=float, count=len(tfidf))
+        scores = values @ self.weights[indices] / math.sqrt(values @ values) + self.bias
+        probabilities = _softmax(scores)
+        best = int(probabilities.argmax())
+        return self.labels[best], float(probabilities[best])
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+
+def _softmax(scores: np.ndarray) -> np.ndarray:
+    exp = np.exp(scores - scores.max(axis=-1, keepdims=True))
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+def training_examples(path: str | None = INTENT_TRAINING_PATH) -> tuple[list[str], list[str]]:
+    questions = [q for examples in SEED_EXAMPLES.values() for q in examples]
+    labels = [intent for intent, examples in SEED_EXAMPLES.items() for _ in examples]
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    example = json.loads(line)
+                    questions.append(example["question"])
+                    labels.append(example["intent"])
+    return questions, labels
+
+
+# ✅ Words a handler may ignore. A question with any other word (or an unconsumed number) asks for
+# something the handler can't evaluate: a price bound ("under 100"), an amenity ("with wifi"), a
+# negation ("don't", "not", "except") or a second intent ("cheapest for 3 guests"). It goes to the model.
+COMMON_WORDS = frozenset(
+    "a an the what s which is are do does you your have has got any me show list see give tell please pls "
+    "can could would i we us our my there here now currently right available availability room rooms option "
+    "options all some offer book kind kinds type types of it that one ones to stay place accommodation "
+    "accommodations in at like want need looking for find get about and or with hi hello hey thanks".split()
+)
+LIST_WORDS = frozenset("prices price rates rate per night".split())
+CHEAP_WORDS = frozenset(
+    "cheap cheapest affordable budget friendly low lowest least expensive inexpensive economical "
+    "cost costs price prices priced rate rates per night nightly most".split()
+)
+EXPENSIVE_WORDS = frozenset(
+    "expensive most priciest pricey highest high cost costs costly price priced rate per night "
+    "luxurious luxury premium top best regardless".split()
+)
+CAPACITY_WORDS = frozenset(
+    "how many guests guest people persons person fit fits sleep sleeps hold holds capacity max maximum occupancy number".split()
+)
+GUESTS_WORDS = frozenset(
+    "guests guest people persons person pax adults adult family group us sleeps sleep fit fits big enough "
+    "accommodate who".split()
+)
+
+
+def _covered(question: str, words: frozenset[str], consumed: str = "") -> bool:
+    """Whether every word of `question`, once the `consumed` match is removed, is one the handler can ignore."""
+    text = question.lower().replace(consumed.lower(), " ", 1) if consumed else question.lower()
+    return all(token in COMMON_WORDS or token in words for token in TOKEN_RE.findall(text))
+
+
+# ✅ Deterministic handlers: (question, available rooms cheapest first) -> (answer, rooms), or None to defer to the model
+Rows = list[dict[str, Any]]
+
+
+def _price(room: dict[str, Any]) -> str:
+    return f"{PRICE_CURRENCY} {room['price_per_night']:,.2f} per night"
+
+
+def list_rooms(question: str, rooms: Rows) -> tuple[str, Rows] | None:
+    if not _covered(question, LIST_WORDS):
+        return None
+    return "Here are the available rooms:", rooms
+
+
+def cheapest_room(question: str, rooms: Rows) -> tuple[str, Rows] | None:
+    # "least expensive" is fine, "most expensive" is the opposite question.
+    if not CHEAP_RE.search(question) or "most expensive" in question.lower() or not _covered(question, CHEAP_WORDS):
+        return None
+    cheapest = [room for room in rooms if room["price_per_night"] == rooms[0]["price_per_night"]]
+    return f"Our cheapest room is {_price(cheapest[0])}:", cheapest
+
+
+def most_expensive_room(question: str, rooms: Rows) -> tuple[str, Rows] | None:
+    if not EXPENSIVE_RE.search(question) or CHEAP_RE.search(question) or not _covered(question, EXPENSIVE_WORDS):
+        return None
+    top = max(room["price_per_night"] for room in rooms)
+    priciest = [room for room in rooms if room["price_per_night"] == top]
+    return f"Our most expensive room is {_price(priciest[0])}:", priciest
+
+
+def room_capacity(question: str, rooms: Rows) -> tuple[str, Rows] | None:
+    if not (match := ROOM_NUMBER_RE.search(question)) or not _covered(question, CAPACITY_WORDS, match.group(0)):
+        return None
+    room = next((room for room in rooms if str(room["room_number"]).lower() == match.group(1).lower()), None)
+    if room is None:
+        # Unknown or currently unavailable room; the model can explain better than a canned answer.
+        return None
+    return f"Room {room['room_number']} fits up to {room['max_guests']} guests.", [room]
+
+
+def rooms_for_guests(question: str, rooms: Rows) -> tuple[str, Rows] | None:
+    if not (match := GUESTS_RE.search(question)) or not _covered(question, GUESTS_WORDS, match.group(0)):
+        return None
+    raw = next(group for group in match.groups() if group)
+    guests = int(raw) if raw.isdigit() else NUMBER_WORDS[raw.lower()]
+    fitting = [room for room in rooms if room["max_guests"] >= guests]
+    if not fitting:
+        return f"Sorry, none of our available rooms fits {guests} guests.", []
+    return f"These rooms fit {guests} guests:", fitting
+
+
+def room_type(question: str, rooms: Rows) -> tuple[str, Rows] | None:
+    text = question.lower()
+    types = {str(room["room_type"]).lower() for room in rooms}
+    wanted = {room_type for room_type in types if re.search(rf"\b{re.escape(room_type)}", text)}
+    # Room type names, singular or plural, are the only extra words this handler understands.
+    type_words = frozenset(word + suffix for room_type in wanted for word in TOKEN_RE.findall(room_type) for suffix in ("", "s"))
+    if not wanted or not _covered(question, type_words):
+        return None
+    return "Here are the matching rooms:", [room for room in rooms if str(room["room_type"]).lower() in wanted]
+
+
+def _handle(intent: str, question: str, rooms: Rows) -> tuple[str, Rows] | None:
+    if not rooms:
+        return "No available rooms at the moment.", []
+    return HANDLERS[intent](question, rooms)
+
+
+HANDLERS: dict[str, Callable[[str, Rows], tuple[str, Rows] | None]] = {
+    "list_rooms": list_rooms,
+    "cheapest_room": cheapest_room,
+    "most_expensive_room": most_expensive_room,
+    "room_capacity": room_capacity,
+    "rooms_for_guests": rooms_for_guests,
+    "room_type": room_type,
+}
+
+
+@dataclass
+class Routed:
+    intent: str
+    confidence: float
+    answer: str
+    rooms: Rows
+
+
+class IntentRouter:
+    """Answer confidently classified room questions locally; everything else goes to the model."""
+
+    def __init__(self, classifier: IntentClassifier, threshold: float = INTENT_CONFIDENCE, enabled: bool = INTENT_ROUTING):
+        self.classifier = classifier
+        self.threshold = threshold
+        self.enabled = enabled
+        self.questions = 0
+        self.answered = 0
+
+    async def route(self, question: str, rooms: Callable[[], Awaitable[Rows]]) -> Routed | None:
+        """A local answer for `question`, or None if it should go to the model.
+
+        `rooms` is only called once a handler has been picked.
+        """
+        if not self.enabled:
+            return None
+        self.questions += 1
+        intent, confidence = self.classifier.predict(question)
+        if intent == OTHER or DATE_RE.search(question):
+            outcome = "model"
+        elif confidence < self.threshold:
+            outcome = "low_confidence"
+        elif (result := _handle(intent, question, await rooms())) is None:
+            outcome = "unresolved"
+        else:
+            self.answered += 1
+            INTENT_ROUTES.inc(intent=intent, outcome="answered")
+            logging.info("🧭 Answered %s locally (p=%.2f)", intent, confidence, extra=sampled())
+            return Routed(intent, confidence, *result)
+        INTENT_ROUTES.inc(intent=intent, outcome=outcome)
+        return None
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "questions": self.questions,
+            "answered_locally": self.answered,
+            "offload_ratio": round(self.answered / self.questions, 4) if self.questions else 0.0,
+        }
+
+
+def build_router() -> IntentRouter:
+    questions, labels = training_examples()
+    classifier = IntentClassifier().fit(questions, labels)
+    logging.info(f"✅ Intent classifier trained on {len(questions)} questions, {len(classifier.vocabulary)} terms.")
+    return IntentRouter(classifier)
+
+
+registry.register("intent_router")(build_router)
+
+
+def get_intent_router() -> IntentRouter:
+    """Return the process-wide router, training it on first use."""
+    return registry.get("intent_router")
@@ -0,0 +1,151 @@
+import os
+import sys
+import json
+import atexit
+import queue
+import random
+import logging
+import logging.handlers
+from collections.abc import Mapping, Sequence
+from datetime import datetime, timezone
+from typing import Any
+
+# ✅ Logging settings
+LOG_LEVEL = os.getenv("LOG_LEVEL", "info").upper()
+# "json" for one JSON object per line, "text" for the classic human-readable format
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+# Records waiting for the writer thread; past this, new records are dropped rather than blocking a request
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Share of high-volume lines (those logged with extra=sampled()) that are written
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.1"))
+# How many IDs a payload summary lists before eliding the rest
+LOG_MAX_IDS = int(os.getenv("LOG_MAX_IDS", "5"))
+
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+# Attributes every LogRecord has; anything else on a record came from `extra=` and is logged as a field
+# (uvicorn's `color_message` is its message with ANSI colours, so it is dropped too)
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message", "asctime", "taskName", "color_message",
+}
+# Columns a summary may name a row by; never guest names, emails or phone numbers
+_ID_COLUMNS = ("id", "reference_number", "room_number")
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, any `extra=` fields and the traceback."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue records as they are, so the message is only formatted on the writer thread.
+
+    The stock QueueHandler formats every record on the caller's thread before queueing
+    it. Arguments are therefore read later, on the writer thread, and must not be mutated
+    after the call (pass summaries or immutable values, not live objects).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # The writer can't keep up; losing a line is better than stalling the event loop.
+            pass
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a record with probability `sample_rate` (set per call with `extra=sampled(rate)`)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = getattr(record, "sample_rate", 1.0)
+        return rate >= 1 or random.random() < rate
+
+
+def sampled(rate: float = LOG_SAMPLE_RATE, **fields: Any) -> dict[str, Any]:
+    """`extra=` for a high-volume line: log about `rate` of its calls, and record the rate so counts can be scaled back up."""
+    return {"sample_rate": rate, **fields}
+
+
+class Summary:
+    """Size-capped description of a query result, computed only if the record is written.
+
+    Lists give a row count and the first LOG_MAX_IDS identifiers; a single row gives its
+    identifiers. Other fields, including guest details, are never included.
+    """
+
+    __slots__ = ("payload",)
+
+    def __init__(self, payload: Any):
+        self.payload = payload
+
+    def __str__(self) -> str:
+        payload = self.payload
+        if payload is None:
+            return "none"
+        if isinstance(payload, Sequence) and not isinstance(payload, (str, bytes)):
+            ids = [_row_id(row) for row in payload[:LOG_MAX_IDS]]
+            more = ", ..." if len(payload) > LOG_MAX_IDS else ""
+            return f"{len(payload)} rows [{', '.join(ids)}{more}]"
+        return f"1 row [{_row_id(payload)}]"
+
+
+def _row_id(row: Any) -> str:
+    if not isinstance(row, Mapping):
+        row = getattr(row, "__dict__", {})
+    return " ".join(f"{column}={row[column]}" for column in _ID_COLUMNS if row.get(column) is not None) or "?"
+
+
+def summarize(payload: Any) -> Summary:
+    return Summary(payload)
+
+
+def configure_logging(level: str = LOG_LEVEL, log_format: str = LOG_FORMAT) -> None:
+    """Route every log record through a queue to a background writer thread.
+
+    Request code only appends the record to the queue; formatting and the write to
+    stderr happen on the listener thread. Safe to call more than once: later calls
+    are ignored, so whichever entry point runs first decides the settings.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT))
+    queue_handler = DeferredQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    queue_handler.addFilter(SamplingFilter())
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
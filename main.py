@@ -1,38 +1,42 @@
 import os
-import asyncio
 import logging
+from collections.abc import AsyncIterator
+from datetime import date
+from uuid import uuid4
 from dotenv import load_dotenv
-from supabase import create_client, Client
 from pydantic import BaseModel
 from pydantic_ai import Agent, RunContext
-from pydantic_ai.models.gemini import GeminiModel
-from pydantic_ai.providers.google_gla import GoogleGLAProvider
+from pydantic_ai.exceptions import UsageLimitExceeded
+from pydantic_ai.messages import ModelRequest, ModelResponse, TextPart, UserPromptPart
 
 from fasthtml.common import *
 from monsterui.all import *
 from fasthtml.svg import *
 
+from admission import Overloaded, admit, client_ip, model_gate, request_usage_limits, retry_after_header
+import availability
+from booking_loader import booking_loader, get_booking, get_booking_by_reference, reference_loader
+from booking_lookup import extract_booking_id, match_booking_key
+from conversation_log import conversation_sink
+import db_changes
+from intent_router import get_intent_router
+from log_config import configure_logging, sampled, summarize
+from parsing import parse_rows
+from registry import LazyModel, warm_up
+from repository import close_repository
+from resilience import CircuitOpen
+from response_cache import response_cache
+from rooms import available_rooms, rooms_cache
+from session_memory import session_memory
+from streaming import sse_event, stream_agent_events
+from web_cache import PageCacheMiddleware, StaticAssets, compression_middleware
+from telemetry import ADMISSIONS, TracingMiddleware, configure_tracing, record_usage, render_metrics, span, traced
+
 # ✅ Load environment variables
 load_dotenv()
 
-# ✅ Set up logging
-logging.basicConfig(
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    level=logging.INFO,
-)
-
-# ✅ Initialize Supabase client
-SUPABASE_URL = os.getenv("supa_url")
-SUPABASE_KEY = os.getenv("supa_key")
-
-def initialize_supabase():
-    if not SUPABASE_URL or not SUPABASE_KEY:
-        logging.critical("❌ Supabase credentials are missing!")
-        raise ValueError("Supabase credentials are missing!")
-    logging.info("✅ Supabase client initialized successfully.")
-    return create_client(SUPABASE_URL, SUPABASE_KEY)
-
-supabase: Client = initialize_supabase()
+# ✅ Set up logging (JSON lines written from a background thread)
+configure_logging()
 
 # ✅ Define Pydantic models
 class InquiryRequest(BaseModel):
@@ -46,7 +50,7 @@ class RoomData(BaseModel):
     price_per_night: float
 
 class BookingRequest(BaseModel):
-    booking_id: str
+    booking_id: str | None = None
 
 class BookingData(BaseModel):
     guest_name: str
@@ -67,74 +71,297 @@ class ResponseModel(BaseModel):
     rooms: list[RoomData] | None = None
     booking: BookingData | None = None
 
-# ✅ Initialize AI Agent
-gem_api = os.getenv("API_KEY")
-model = GeminiModel("gemini-2.0-flash", provider=GoogleGLAProvider(api_key=gem_api))
-
+# ✅ Initialize AI Agent (the Gemini client is built on first use)
 agent = Agent(
-    model=model,
+    model=LazyModel(),
     result_type=ResponseModel,
     system_prompt="You are an AI assistant that helps users inquire about available rooms and fetch booking details. "
-                  "Use the available tools to retrieve real data instead of generating responses."
+                  "Use the available tools to retrieve real data instead of generating responses. "
+                  "When the guest gives travel dates, use find_available_rooms instead of get_available_rooms. "
+                  "When you call get_available_rooms or find_available_rooms, you may add one short sentence for the guest alongside the call; "
+                  "the room list itself is shown to the guest directly. "
+                  "If a question needs more than one lookup (for example available rooms and a booking), "
+                  "call every tool you need in the same response; they run concurrently."
+)
+
+OVER_BUDGET_ANSWER = "That question needs more work than I can do in one go. Could you ask something more specific?"
+BUSY_ANSWER = "We're handling a lot of questions right now. Please try again in a moment."
+ASSISTANT_DOWN_ANSWER = "Our assistant is temporarily unavailable."
+
+# Tools whose return value is shown to the guest as-is, ending the run without a second model pass.
+INQUIRY_TERMINAL_TOOLS = frozenset(
+    name.strip() for name in os.getenv("INQUIRY_TERMINAL_TOOLS", "get_available_rooms,find_available_rooms").split(",") if name.strip()
 )
 
 @agent.tool
-async def get_available_rooms(ctx: RunContext[InquiryRequest]) -> ResponseModel:
+@traced("tool")
+async def get_available_rooms(ctx: RunContext[InquiryRequest | BookingRequest]) -> ResponseModel:
     """Fetch available rooms from the database."""
-    logging.info(f"🛠️ Fetching available rooms for inquiry: {ctx.deps.question}")
+    logging.info("🛠️ Fetching available rooms", extra=sampled())
 
     try:
-        response = await asyncio.to_thread(
-            lambda: supabase.from_("rooms")
-                .select("room_number, room_type, description, max_guests, price_per_night")
-                .eq("status", "Available")
-                .order("price_per_night", desc=False)
-                .execute()
-        )
+        rows = await available_rooms()
 
-        logging.info(f"📌 Supabase response: {response.data}")
+        logging.debug("📌 Available rooms: %s", summarize(rows))
 
-        if not response.data:
+        if not rows:
             logging.warning("⚠️ No available rooms found.")
             return ResponseModel(answer="No available rooms at the moment.", rooms=[])
 
-        rooms = [RoomData(**room) for room in response.data]
+        rooms = parse_rows(RoomData, rows)
         return ResponseModel(answer="Here are the available rooms:", rooms=rooms)
 
     except Exception as e:
-        logging.critical(f"❌ Error retrieving room data: {e}", exc_info=True)
+        logging.critical("❌ Error retrieving room data: %s", e, exc_info=True)
         return ResponseModel(answer="An error occurred while retrieving room availability.", rooms=[])
 
+@agent.system_prompt
+def current_date() -> str:
+    return f"Today is {date.today():%A, %B %d, %Y}. Resolve relative dates like 'next weekend' from it."
+
 @agent.tool
-async def get_booking_by_id(ctx: RunContext[BookingRequest]) -> ResponseModel:
-    """Fetch a specific booking using the provided booking ID."""
-    logging.info(f"🛠️ Fetching booking data for ID: {ctx.deps.booking_id}")
+@traced("tool")
+async def find_available_rooms(
+    ctx: RunContext[InquiryRequest | BookingRequest], check_in: date, check_out: date, guests: int = 1
+) -> ResponseModel:
+    """Find rooms free for a stay, i.e. with none of its nights already booked.
+
+    Args:
+        check_in: Arrival date.
+        check_out: Departure date; the guest doesn't stay this night.
+        guests: Number of guests, rooms that sleep fewer are left out.
+    """
+    logging.info("🛠️ Finding rooms free from %s to %s for %d guests", check_in, check_out, guests, extra=sampled())
 
     try:
-        response = await asyncio.to_thread(
-            lambda: supabase.from_("bookings").select("*").eq("id", ctx.deps.booking_id).maybe_single().execute()
-        )
+        rows = await availability.find_available_rooms(check_in, check_out, guests)
+
+        if not rows:
+            return ResponseModel(answer=f"No rooms are free from {check_in} to {check_out} for {guests} guests.", rooms=[])
+
+        rooms = parse_rows(RoomData, rows)
+        return ResponseModel(answer=f"Here are the rooms free from {check_in} to {check_out}:", rooms=rooms)
+
+    except ValueError as e:
+        return ResponseModel(answer=str(e), rooms=[])
+    except CircuitOpen:
+        logging.warning("⚠️ Availability lookup skipped, Supabase circuit is open.")
+        return ResponseModel(answer="Room availability is temporarily unavailable. Please try again shortly.", rooms=[])
+    except Exception as e:
+        logging.critical("❌ Error checking room availability: %s", e, exc_info=True)
+        return ResponseModel(answer="An error occurred while checking room availability.", rooms=[])
 
-        logging.info(f"📌 Supabase response: {response.data}")
+async def fetch_booking(column: str, value: str) -> ResponseModel:
+    """Look up a single booking by primary key or reference number.
 
-        if not response.data:
-            logging.warning(f"⚠️ No booking found for ID {ctx.deps.booking_id}.")
+    Concurrent lookups from every session are coalesced into one query per batch window.
+    """
+    try:
+        if column == "reference_number":
+            booking = await get_booking_by_reference(value)
+        else:
+            booking = await get_booking(value)
+
+        logging.debug("📌 Supabase response: %s", summarize(booking))
+
+        if not booking:
+            logging.warning("⚠️ No booking found by %s.", column, extra=sampled())
             return ResponseModel(answer="No booking found", booking=None)
 
-        return ResponseModel(answer="Here is your booking:", booking=BookingData(**response.data))
+        return ResponseModel(answer="Here is your booking:", booking=BookingData(**booking))
+
+    except CircuitOpen:
+        logging.warning("⚠️ Booking lookup skipped, Supabase circuit is open.")
+        return ResponseModel(answer="Booking lookups are temporarily unavailable. Please try again shortly.", booking=None)
+    except Exception as e:
+        logging.critical("❌ Error retrieving booking: %s", e, exc_info=True)
+        return ResponseModel(answer="An error occurred while retrieving booking details.", booking=None)
 
+@agent.tool
+@traced("tool")
+async def get_booking_by_id(ctx: RunContext[BookingRequest | InquiryRequest], booking_id: str | None = None) -> ResponseModel:
+    """Fetch a specific booking by its booking ID (a UUID) or reference number (e.g. BK12345)."""
+    booking_id = booking_id or getattr(ctx.deps, "booking_id", None)
+    if not booking_id:
+        return ResponseModel(answer="Please provide your booking ID or reference number.", booking=None)
+    logging.info("🛠️ Fetching booking data", extra=sampled())
+    return await fetch_booking(*(match_booking_key(booking_id) or ("id", booking_id)))
+
+# ✅ Booking lookup endpoint
+async def answer_booking_query(text: str, session_id: str) -> ResponseModel:
+    """Serve bare booking IDs and reference numbers straight from the database.
+
+    Only free-form questions are sent to the model.
+    """
+    if key := match_booking_key(text):
+        logging.info("⚡ Direct booking lookup by %s", key[0], extra=sampled())
+        return await fetch_booking(*key)
+
+    # The question itself is never a booking key; without one the tool asks the guest for it.
+    booking_id = extract_booking_id(text)
+    try:
+        history = await session_memory.get(session_id)
+        async with model_gate:
+            with span("agent", "booking") as run_span:
+                result = await agent.run(
+                    text,
+                    deps=BookingRequest(booking_id=booking_id),
+                    message_history=history,
+                    usage_limits=request_usage_limits,
+                )
+                record_usage(run_span, result.usage())
+        await session_memory.append(session_id, result.new_messages())
+        conversation_sink.record(text, result)
+        return result.data
+    except Overloaded:
+        raise
+    except CircuitOpen as e:
+        logging.warning("⚠️ Degraded booking answer: %s", e)
+        return ResponseModel(
+            answer=f"{ASSISTANT_DOWN_ANSWER} You can still look up a booking by entering its booking ID or reference number.",
+            booking=None,
+        )
+    except UsageLimitExceeded as e:
+        logging.warning("⚠️ Booking question over budget: %s", e)
+        ADMISSIONS.inc(endpoint="get_booking", outcome="budget_exceeded")
+        return ResponseModel(answer=OVER_BUDGET_ANSWER, booking=None)
     except Exception as e:
-        logging.critical(f"❌ Error retrieving booking: {e}", exc_info=True)
+        logging.critical("❌ Error answering booking question: %s", e, exc_info=True)
         return ResponseModel(answer="An error occurred while retrieving booking details.", booking=None)
 
+# ✅ Streaming inquiry endpoint
+async def cached_inquiry(question: str) -> ResponseModel | None:
+    """Answer a repeated first-turn question from the response cache, with fresh room data."""
+    cached = response_cache.lookup(question)
+    if cached is None:
+        return None
+    logging.info("⚡ Response cache hit", extra=sampled())
+    if cached.room_numbers is None:
+        return ResponseModel(answer=cached.answer)
+    rows = await available_rooms()
+    if not cached.all_rooms:
+        by_number = {row["room_number"]: row for row in rows}
+        # Rooms that have since been booked drop out; prices always come from the current rows.
+        rows = [by_number[number] for number in cached.room_numbers if number in by_number]
+    return ResponseModel(answer=cached.answer, rooms=parse_rows(RoomData, rows))
+
+async def remember_inquiry(question: str, response: ResponseModel) -> None:
+    if response.rooms == []:
+        # Empty lists come from "no rooms right now" or a failed lookup; neither is worth replaying.
+        return
+    all_numbers = {row["room_number"] for row in await available_rooms()}
+    room_numbers = [room.room_number for room in response.rooms] if response.rooms is not None else None
+    response_cache.store(
+        question,
+        response.answer,
+        room_numbers,
+        all_rooms=room_numbers is not None and set(room_numbers) == all_numbers,
+    )
+
+async def routed_inquiry(question: str, session_id: str) -> ResponseModel | None:
+    """Answer simple room questions (cheapest, rooms for N guests, ...) from the room list without the model."""
+    routed = await get_intent_router().route(question, available_rooms)
+    if routed is None:
+        return None
+    # Keep the exchange in the session so a follow-up question to the model has it as context.
+    room_numbers = ", ".join(str(room["room_number"]) for room in routed.rooms)
+    await session_memory.append(session_id, [
+        ModelRequest(parts=[UserPromptPart(content=question)]),
+        ModelResponse(parts=[TextPart(content=f"{routed.answer} Rooms: {room_numbers or 'none'}.")]),
+    ])
+    return ResponseModel(answer=routed.answer, rooms=parse_rows(RoomData, routed.rooms))
+
+async def stream_inquiry(question: str, session_id: str) -> AsyncIterator[str]:
+    """Run the agent and push partial results to the browser as server-sent events."""
+    try:
+        history = await session_memory.get(session_id)
+        # Local routing and the response cache only see the question, so follow-ups ("which is cheapest?"
+        # after a dated answer) need the model and the conversation so far.
+        if not history and (routed := await routed_inquiry(question, session_id)) is not None:
+            yield sse_event("done", routed)
+            return
+
+        # Only first-turn questions are context-free enough to share answers between visitors.
+        if not history and (cached := await cached_inquiry(question)) is not None:
+            yield sse_event("done", cached)
+            return
+
+        async with model_gate:
+            with span("agent", "inquiry") as run_span:
+                tool_response = None
+                dated = False
+                async for kind, payload in stream_agent_events(
+                    agent,
+                    question,
+                    deps=InquiryRequest(question=question),
+                    message_history=history,
+                    terminal_tools=INQUIRY_TERMINAL_TOOLS,
+                    usage_limits=request_usage_limits,
+                ):
+                    if kind == "tool" and isinstance(payload.content, ResponseModel) and payload.content.rooms is not None:
+                        # Render the room list as soon as the tool returns, before the model has finished.
+                        tool_response = payload.content
+                        dated = dated or payload.tool_name == "find_available_rooms"
+                        yield sse_event("rooms", payload.content)
+                    elif kind == "partial" and payload.answer:
+                        yield sse_event("answer", {"answer": payload.answer})
+                    elif kind == "result":
+                        record_usage(run_span, payload.usage())
+                        yield sse_event("done", payload.data)
+                        await session_memory.append(session_id, payload.new_messages())
+                        conversation_sink.record(question, payload)
+                        # Answers for particular dates can't be replayed against today's room list.
+                        if not history and not dated:
+                            answer = payload.data
+                            if answer.rooms is None and tool_response is not None:
+                                answer = answer.model_copy(update={"rooms": tool_response.rooms})
+                            await remember_inquiry(question, answer)
+    except Overloaded as e:
+        # Headers are already sent on a stream, so shed with an immediate error event instead of a 429.
+        logging.warning("⚠️ Shedding inquiry: %s", e)
+        ADMISSIONS.inc(endpoint="inquire", outcome="overloaded")
+        yield sse_event("error", {"answer": BUSY_ANSWER})
+    except CircuitOpen as e:
+        # Without the model, the most useful answer we can give is the current room list.
+        logging.warning("⚠️ Degraded inquiry answer: %s", e)
+        try:
+            rooms = parse_rows(RoomData, await available_rooms())
+            yield sse_event("done", ResponseModel(answer=f"{ASSISTANT_DOWN_ANSWER} Here are the rooms available right now:", rooms=rooms))
+        except Exception as e:
+            logging.critical("❌ Error serving degraded inquiry: %s", e, exc_info=True)
+            yield sse_event("error", {"answer": f"{ASSISTANT_DOWN_ANSWER} Please try again shortly."})
+    except UsageLimitExceeded as e:
+        logging.warning("⚠️ Inquiry over budget: %s", e)
+        ADMISSIONS.inc(endpoint="inquire", outcome="budget_exceeded")
+        yield sse_event("error", {"answer": OVER_BUDGET_ANSWER})
+    except Exception as e:
+        logging.critical("❌ Error streaming inquiry response: %s", e, exc_info=True)
+        yield sse_event("error", {"answer": "An error occurred while processing your inquiry."})
+
 # ✅ FastHTML UI Components
-app, rt = fast_app(hdrs=Theme.blue.headers())
+def session_id(session) -> str:
+    """Stable ID for the browser's signed FastHTML session, used to key its chat history."""
+    if "sid" not in session:
+        session["sid"] = uuid4().hex
+    return session["sid"]
+
+# ✅ Static files get content-hashed URLs; "/" and "/booking" are rendered once per worker
+static_assets = StaticAssets()
+
+app, rt = fast_app(hdrs=Theme.blue.headers(),
+                   routes=[Route("/static/{path:path}", static_assets.serve),
+                           Route("/api/db/changes", db_changes.webhook, methods=["POST"])],
+                   middleware=[Middleware(TracingMiddleware), compression_middleware(),
+                               Middleware(PageCacheMiddleware, paths=("/", "/booking"))],
+                   secret_key=os.getenv("SESSION_SECRET"),
+                   on_startup=[configure_tracing, warm_up, conversation_sink.start],
+                   on_shutdown=[model_gate.drain, conversation_sink.stop, close_repository])
 
 def Navbar(active_page):
     return Div(
         DivFullySpaced(
             DivLAligned(
-                Img(src='/static/logo-bg.png', height=30, width=30, cls="rounded-full"),
+                Img(src=static_assets.url('logo-bg.png'), height=30, width=30, cls="rounded-full"),
                 H3("Bukana Agent", cls="text-lg font-semibold text-gray-900"),
                 cls="flex items-center gap-3"
             ),
@@ -150,7 +377,7 @@ def Navbar(active_page):
         cls="bg-white shadow-md fixed top-0 w-full z-50"
     )
 
-def ChatbotUI(api_endpoint, placeholder, query_param):
+def ChatbotUI(api_endpoint, placeholder, query_param, stream=False):
     return Container(
         CardContainer(
             Card(
@@ -162,7 +389,7 @@ def ChatbotUI(api_endpoint, placeholder, query_param):
                             Input(id="user-input", placeholder=placeholder, 
                                   cls="w-full border rounded-lg px-4 py-2 focus:ring-2 focus:ring-blue-500 outline-none"),
                             Button("Ask", cls=ButtonT.primary + " px-4 py-2 rounded-lg hover:bg-blue-600 transition",
-                                   type="button", onclick=f"fetchData('{api_endpoint}', '{query_param}')"),
+                                   type="button", onclick=f"{'streamData' if stream else 'fetchData'}('{api_endpoint}', '{query_param}')"),
                         ),
                         cls="flex gap-2 mt-3",
                         id="chat-form"
@@ -171,36 +398,52 @@ def ChatbotUI(api_endpoint, placeholder, query_param):
             ),
             cls="w-full max-w-lg mx-auto mt-8 shadow-lg p-4"
         ),
-        Script("""
-        async function fetchData(api, param) {
-            let inputField = document.getElementById('user-input');
-            let userInput = inputField.value.trim();
-            let chatWindow = document.getElementById('chat-window');
-
-            if (!userInput) {
-                chatWindow.innerHTML += "<div class='p-2 bg-red-100 rounded-lg my-1'>❌ Please enter a value.</div>";
-                return;
-            }
-
-            chatWindow.innerHTML += `<div class='p-2 bg-gray-100 rounded-lg my-1'>🗣️ You: ${userInput}</div>`;
-            chatWindow.innerHTML += "<div class='p-2 bg-gray-100 rounded-lg my-1'>🔄 Fetching response...</div>";
-
-            let response = await fetch(`/${api}?${param}=${encodeURIComponent(userInput)}`);
-            let data = await response.json();
-
-            chatWindow.innerHTML += `<div class='p-2 bg-blue-100 rounded-lg my-1'>${data.answer || "No data found."}</div>`;
-        }
-        """)
+        Script(src=static_assets.url("chat.js"), defer=True),
     )
 
 @rt("/")
 def inquiry():
     return Container(
         Navbar("inquiry"),
-        ChatbotUI("api/inquire", "Ask about rooms...", "question"),
+        ChatbotUI("api/inquire", "Ask about rooms...", "question", stream=True),
         cls="mt-24 flex justify-center px-4 md:px-0"
     )
 
+@rt("/api/inquire")
+async def api_inquire(question: str, session, request):
+    sid = session_id(session)
+    if retry_after := admit("inquire", sid, client_ip(request)):
+        return JSONResponse({"answer": BUSY_ANSWER}, status_code=429, headers=retry_after_header(retry_after))
+    return EventStream(stream_inquiry(question, sid))
+
+@rt("/api/get_booking")
+async def api_get_booking(booking_id: str, session, request):
+    sid = session_id(session)
+    if retry_after := admit("get_booking", sid, client_ip(request)):
+        return JSONResponse({"answer": BUSY_ANSWER}, status_code=429, headers=retry_after_header(retry_after))
+    try:
+        response = await answer_booking_query(booking_id, sid)
+    except Overloaded as e:
+        logging.warning("⚠️ Shedding booking question: %s", e)
+        ADMISSIONS.inc(endpoint="get_booking", outcome="overloaded")
+        return JSONResponse({"answer": BUSY_ANSWER}, status_code=429, headers=retry_after_header(1))
+    return JSONResponse(response.model_dump())
+
+@rt("/api/cache/stats")
+def api_cache_stats():
+    return JSONResponse({
+        "rooms": rooms_cache.stats(),
+        "occupancy": availability.occupancy_cache.stats(),
+        "booking_loader": booking_loader.stats(),
+        "reference_loader": reference_loader.stats(),
+        "responses": response_cache.stats(),
+        "intents": get_intent_router().stats(),
+    })
+
+@rt("/metrics")
+def metrics():
+    return Response(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @rt("/booking")
 def booking():
     return Container(
@@ -209,4 +452,5 @@ def booking():
         cls="mt-24 flex justify-center px-4 md:px-0"
     )
 
-serve()
+if __name__ == "__main__":
+    serve()
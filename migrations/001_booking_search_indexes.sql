@@ -0,0 +1,29 @@
+-- Indexes for the booking and room access paths used by repository.py.
+--
+-- Every booking search orders by (check_in_date desc, id desc) and pages with a keyset
+-- on that pair, so each index ends with those columns: Postgres can then walk the index
+-- in order, stop after `limit` rows and never sort.
+--
+-- CREATE INDEX CONCURRENTLY cannot run inside a transaction block; run this file with
+-- autocommit (e.g. `psql -f`, or one statement at a time in the Supabase SQL editor).
+
+-- Search by guest email (find_customer_bookings, search_bookings(guest_email=...))
+create index concurrently if not exists bookings_guest_email_check_in_idx
+    on public.bookings (guest_email, check_in_date desc, id desc);
+
+-- Search by date range alone, and the unfiltered keyset page
+create index concurrently if not exists bookings_check_in_idx
+    on public.bookings (check_in_date desc, id desc);
+
+-- Search by status, optionally within a date range
+create index concurrently if not exists bookings_status_check_in_idx
+    on public.bookings (status, check_in_date desc, id desc);
+
+-- Lookup by reference number (get_booking_by_reference, search_bookings(reference_number=...))
+create unique index concurrently if not exists bookings_reference_number_key
+    on public.bookings (reference_number);
+
+-- list_available_rooms: status = 'Available' ordered by price
+create index concurrently if not exists rooms_available_price_idx
+    on public.rooms (price_per_night)
+    where status = 'Available';
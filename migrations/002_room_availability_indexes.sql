@@ -0,0 +1,10 @@
+-- Indexes for the availability engine (availability.py).
+--
+-- The occupancy index is rebuilt from every booking that checks out after today,
+-- paged by id; this covers that scan without touching past bookings.
+--
+-- Run with autocommit, like 001_booking_search_indexes.sql.
+
+create index concurrently if not exists bookings_check_out_idx
+    on public.bookings (check_out_date, id)
+    include (room_id, check_in_date, status);
@@ -0,0 +1,23 @@
+import functools
+from collections.abc import Mapping, Sequence
+from typing import Any, TypeVar
+
+from pydantic import BaseModel, TypeAdapter
+
+M = TypeVar("M", bound=BaseModel)
+
+
+@functools.cache
+def list_adapter(model: type[M]) -> TypeAdapter[list[M]]:
+    """The TypeAdapter for `list[model]`, built once per model (building one compiles a validator)."""
+    return TypeAdapter(list[model])
+
+
+def parse_rows(model: type[M], rows: Sequence[Mapping[str, Any]]) -> list[M]:
+    """Validate a whole result set into `model` instances in one call into pydantic-core.
+
+    About 1.5x faster than `[model(**row) for row in rows]`, and faster than building
+    the instances unvalidated with `model_construct`; see bench/parse_bench.py.
+    Extra columns are ignored, as with `model(**row)`.
+    """
+    return list_adapter(model).validate_python(rows)
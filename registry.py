@@ -0,0 +1,119 @@
+import os
+import logging
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any
+
+from dotenv import load_dotenv
+from pydantic_ai.messages import ModelResponse
+from pydantic_ai.models import Model, StreamedResponse
+from pydantic_ai.models.wrapper import WrapperModel
+from pydantic_ai.usage import Usage
+
+from resilience import MODEL_CALL_TIMEOUT, model_breaker
+from telemetry import record_usage, span
+
+# ✅ Load environment variables
+load_dotenv()
+
+GEMINI_MODEL_NAME = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
+
+_factories: dict[str, Callable[[], Any]] = {}
+_instances: dict[str, Any] = {}
+
+
+def register(name: str) -> Callable[[Callable[[], Any]], Callable[[], Any]]:
+    """Register a zero-argument factory for a process-wide shared object."""
+
+    def decorator(factory: Callable[[], Any]) -> Callable[[], Any]:
+        _factories[name] = factory
+        return factory
+
+    return decorator
+
+
+def get(name: str) -> Any:
+    """Return the shared instance for `name`, building it on first use."""
+    try:
+        return _instances[name]
+    except KeyError:
+        instance = _instances[name] = _factories[name]()
+        logging.info(f"✅ Initialized {name}.")
+        return instance
+
+
+def peek(name: str) -> Any | None:
+    """Return the shared instance for `name` if it has already been built."""
+    return _instances.get(name)
+
+
+def discard(name: str) -> Any | None:
+    """Forget the shared instance for `name` and return it, e.g. so the caller can close it."""
+    return _instances.pop(name, None)
+
+
+def warm_up(*names: str) -> None:
+    """Build the given shared objects (all registered ones by default) ahead of the first request."""
+    for name in names or tuple(_factories):
+        get(name)
+
+
+@contextmanager
+def override(name: str, instance: Any) -> Iterator[None]:
+    """Temporarily replace a shared object, e.g. with a test model or a local database."""
+    previous = _instances.get(name)
+    _instances[name] = instance
+    try:
+        yield
+    finally:
+        if previous is None:
+            _instances.pop(name, None)
+        else:
+            _instances[name] = previous
+
+
+@register("gemini_model")
+def create_gemini_model() -> Model:
+    import httpx
+    from pydantic_ai.models.gemini import GeminiModel
+    from pydantic_ai.providers.google_gla import GoogleGLAProvider
+
+    http_client = httpx.AsyncClient(timeout=httpx.Timeout(MODEL_CALL_TIMEOUT, connect=5))
+    return GeminiModel(GEMINI_MODEL_NAME, provider=GoogleGLAProvider(api_key=os.getenv("API_KEY"), http_client=http_client))
+
+
+class LazyModel(WrapperModel):
+    """Model that resolves the shared registry model on first request.
+
+    Lets agents be declared at import time without building the provider's HTTP client.
+    """
+
+    def __init__(self, name: str = "gemini_model"):
+        self.registry_name = name
+
+    @property
+    def wrapped(self) -> Model:
+        return get(self.registry_name)
+
+    async def request(self, *args: Any, **kwargs: Any) -> tuple[ModelResponse, Usage]:
+        with span("model", self.model_name) as record:
+            response, usage = await model_breaker.call(lambda: self.wrapped.request(*args, **kwargs))
+            record_usage(record, usage)
+            return response, usage
+
+    @asynccontextmanager
+    async def request_stream(self, *args: Any, **kwargs: Any) -> AsyncIterator[StreamedResponse]:
+        with span("model", self.model_name) as record:
+            # Streams are bounded by the provider client's timeout; the breaker only tracks their outcome.
+            model_breaker.before_call()
+            try:
+                async with self.wrapped.request_stream(*args, **kwargs) as response_stream:
+                    yield response_stream
+            except Exception as e:
+                model_breaker.record_failure(e)
+                raise
+            except BaseException:
+                model_breaker.abandon()
+                raise
+            model_breaker.record_success()
+            record_usage(record, response_stream.usage())
@@ -0,0 +1,228 @@
+import os
+import logging
+from datetime import date
+from typing import Any
+
+import httpx
+from dotenv import load_dotenv
+from postgrest import AsyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
+
+import registry
+from resilience import guarded, supabase_breaker
+from telemetry import record_response_size, traced
+
+# ✅ Load environment variables
+load_dotenv()
+
+SUPABASE_URL = os.getenv("supa_url")
+SUPABASE_KEY = os.getenv("supa_key")
+
+# ✅ Connection pool settings, shared by every query in the process
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_KEEPALIVE_EXPIRY = float(os.getenv("DB_KEEPALIVE_EXPIRY", "30"))
+DB_TIMEOUT = float(os.getenv("DB_TIMEOUT", "10"))
+
+AVAILABLE_ROOM_COLUMNS = "room_number, room_type, description, max_guests, status, price_per_night"
+# Rooms and the booking fields the availability engine needs to build its occupancy index
+ROOM_COLUMNS = f"id, {AVAILABLE_ROOM_COLUMNS}"
+OCCUPANCY_COLUMNS = "id, room_id, check_in_date, check_out_date, status"
+OCCUPANCY_PAGE_SIZE = 1000
+# Bookings with their room number embedded through the rooms foreign key, in one round trip
+CUSTOMER_BOOKING_COLUMNS = (
+    "id, room_id, guest_name, guest_email, guest_phone, check_in_date, check_out_date, "
+    "number_of_guests, total_price, status, payment_method, rooms(room_number)"
+)
+# What a booking search hands back to the model; full rows stay behind get_booking()
+BOOKING_SEARCH_COLUMNS = (
+    "id, reference_number, guest_name, guest_email, check_in_date, check_out_date, "
+    "number_of_guests, total_price, status"
+)
+
+
+class Repository:
+    """Typed async access to the Supabase tables used by the agents.
+
+    Queries go straight to PostgREST over a pooled keep-alive HTTP client, so no
+    thread hops and no new TLS handshake per query.
+    """
+
+    def __init__(self, client: AsyncPostgrestClient):
+        self.client = client
+
+    @traced("db")
+    @guarded(supabase_breaker, hedge=True)
+    async def list_available_rooms(self) -> list[dict[str, Any]]:
+        """Available rooms ordered by price, cheapest first."""
+        response = await (
+            self.client.from_("rooms")
+            .select(AVAILABLE_ROOM_COLUMNS)
+            .eq("status", "Available")
+            .order("price_per_night", desc=False)
+            .execute()
+        )
+        return response.data
+
+    @traced("db")
+    @guarded(supabase_breaker, hedge=True)
+    async def list_rooms(self) -> list[dict[str, Any]]:
+        """Every room whatever its status, ordered by price, cheapest first."""
+        response = await self.client.from_("rooms").select(ROOM_COLUMNS).order("price_per_night", desc=False).execute()
+        return response.data
+
+    async def list_occupancy(self, since: date) -> list[dict[str, Any]]:
+        """Room, dates and status of every booking checking out after `since`.
+
+        Fetched in keyset pages of OCCUPANCY_PAGE_SIZE on id, since PostgREST caps the rows
+        per response. Each page is its own guarded call, with its own timeout and hedge.
+        """
+        rows: list[dict[str, Any]] = []
+        while True:
+            page = await self._occupancy_page(since, rows[-1]["id"] if rows else None)
+            rows.extend(page)
+            if len(page) < OCCUPANCY_PAGE_SIZE:
+                return rows
+
+    @traced("db")
+    @guarded(supabase_breaker, hedge=True)
+    async def _occupancy_page(self, since: date, after_id: str | None) -> list[dict[str, Any]]:
+        query = self.client.from_("bookings").select(OCCUPANCY_COLUMNS).gt("check_out_date", since.isoformat())
+        if after_id is not None:
+            query = query.gt("id", after_id)
+        response = await query.order("id").limit(OCCUPANCY_PAGE_SIZE).execute()
+        return response.data
+
+    @traced("db")
+    @guarded(supabase_breaker, hedge=True)
+    async def get_booking(self, booking_id: str) -> dict[str, Any] | None:
+        return await self._get_booking_by("id", booking_id)
+
+    @traced("db")
+    @guarded(supabase_breaker, hedge=True)
+    async def get_booking_by_reference(self, reference_number: str) -> dict[str, Any] | None:
+        return await self._get_booking_by("reference_number", reference_number)
+
+    @traced("db")
+    @guarded(supabase_breaker, hedge=True)
+    async def get_bookings(self, booking_ids: list[str]) -> list[dict[str, Any]]:
+        """Every booking whose id is in `booking_ids`, in one request; ids that don't exist are left out."""
+        return await self._get_bookings_by("id", booking_ids)
+
+    @traced("db")
+    @guarded(supabase_breaker, hedge=True)
+    async def get_bookings_by_reference(self, reference_numbers: list[str]) -> list[dict[str, Any]]:
+        return await self._get_bookings_by("reference_number", reference_numbers)
+
+    @traced("db")
+    @guarded(supabase_breaker, hedge=True)
+    async def search_bookings(
+        self,
+        *,
+        limit: int,
+        check_in_from: date | None = None,
+        check_in_to: date | None = None,
+        guest_email: str | None = None,
+        status: str | None = None,
+        reference_number: str | None = None,
+        after: tuple[str, str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Bookings matching every given filter, newest check-in first, at most `limit` rows.
+
+        Pages with a keyset on (check_in_date, id): pass the last row's pair as `after`
+        to continue. See migrations/001_booking_search_indexes.sql for the backing indexes.
+        """
+        query = self.client.from_("bookings").select(BOOKING_SEARCH_COLUMNS)
+        if check_in_from:
+            query = query.gte("check_in_date", check_in_from.isoformat())
+        if check_in_to:
+            query = query.lte("check_in_date", check_in_to.isoformat())
+        if guest_email:
+            query = query.eq("guest_email", guest_email)
+        if status:
+            query = query.eq("status", status)
+        if reference_number:
+            query = query.eq("reference_number", reference_number)
+        if after:
+            check_in_date, booking_id = after
+            query = query.or_(
+                f"check_in_date.lt.{check_in_date},and(check_in_date.eq.{check_in_date},id.lt.{booking_id})"
+            )
+        response = await (
+            query.order("check_in_date", desc=True).order("id", desc=True).limit(limit).execute()
+        )
+        return response.data
+
+    @traced("db")
+    @guarded(supabase_breaker, hedge=True)
+    async def find_customer_bookings(self, guest_emails: list[str]) -> list[dict[str, Any]]:
+        """Every booking for the given guests, newest check-in first, each with `rooms.room_number` embedded.
+
+        Emails are compared exactly; callers pass them in the lowercase form bookings store.
+        """
+        response = await (
+            self.client.from_("bookings")
+            .select(CUSTOMER_BOOKING_COLUMNS)
+            .in_("guest_email", guest_emails)
+            .order("check_in_date", desc=True)
+            .execute()
+        )
+        return response.data
+
+    async def insert_conversation(self, conversation: dict[str, Any]) -> None:
+        await self.insert_conversations([conversation])
+
+    @traced("db")
+    @guarded(supabase_breaker)
+    async def insert_conversations(self, conversations: list[dict[str, Any]]) -> None:
+        """Bulk-insert conversation rows in a single request."""
+        await self.client.from_("conversations").insert(conversations, returning="minimal").execute()
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    async def _get_booking_by(self, column: str, value: str) -> dict[str, Any] | None:
+        response = await self.client.from_("bookings").select("*").eq(column, value).maybe_single().execute()
+        return response.data if response else None
+
+    async def _get_bookings_by(self, column: str, values: list[str]) -> list[dict[str, Any]]:
+        response = await self.client.from_("bookings").select("*").in_(column, values).execute()
+        return response.data
+
+
+def create_repository(url: str | None = SUPABASE_URL, key: str | None = SUPABASE_KEY) -> Repository:
+    if not url or not key:
+        logging.critical("❌ Supabase credentials are missing! Check environment variables.")
+        raise ValueError("Supabase credentials are missing!")
+
+    http_client = httpx.AsyncClient(
+        base_url=f"{url}/rest/v1",
+        timeout=DB_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=DB_POOL_SIZE,
+            max_keepalive_connections=DB_POOL_SIZE,
+            keepalive_expiry=DB_KEEPALIVE_EXPIRY,
+        ),
+        http2=True,
+        follow_redirects=True,
+        event_hooks={"response": [record_response_size]},
+    )
+    client = AsyncPostgrestClient(
+        f"{url}/rest/v1",
+        headers={**DEFAULT_POSTGREST_CLIENT_HEADERS, "apikey": key, "Authorization": f"Bearer {key}"},
+        http_client=http_client,
+    )
+    logging.info("✅ Supabase client initialized successfully.")
+    return Repository(client)
+
+
+registry.register("repository")(create_repository)
+
+
+def get_repository() -> Repository:
+    """Return the process-wide repository, creating it on first use."""
+    return registry.get("repository")
+
+
+async def close_repository() -> None:
+    if (repository := registry.discard("repository")) is not None:
+        await repository.aclose()
@@ -0,0 +1,167 @@
+import os
+import time
+import asyncio
+import logging
+import functools
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from telemetry import RESILIENCE_EVENTS
+
+# ✅ Per-dependency settings (timeouts in seconds)
+SUPABASE_CALL_TIMEOUT = float(os.getenv("SUPABASE_CALL_TIMEOUT", "5"))
+MODEL_CALL_TIMEOUT = float(os.getenv("MODEL_CALL_TIMEOUT", "30"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "15"))
+# Hedge idempotent reads: send a second copy once the first has taken longer than the recent p95
+HEDGE_READS = os.getenv("HEDGE_READS", "true").lower() == "true"
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "0.05"))
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a dependency that is currently failing."""
+
+
+class LatencyTracker:
+    """Rolling window of recent call latencies."""
+
+    def __init__(self, size: int = 200):
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> float | None:
+        if len(self._samples) < 20:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class CircuitBreaker:
+    """Fail fast while a dependency is unhealthy.
+
+    Closed: calls go through with a timeout; `failure_threshold` consecutive failures
+    (errors or timeouts) open the circuit. Open: calls raise CircuitOpen immediately
+    for `reset_timeout` seconds. Half-open: one trial call decides whether to close
+    the circuit again or re-open it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        timeout: float,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.latency = LatencyTracker()
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        """Raise CircuitOpen unless a call may go through now."""
+        state = self.state
+        if state == "open" or (state == "half_open" and self._trial_running):
+            RESILIENCE_EVENTS.inc(dependency=self.name, event="rejected")
+            raise CircuitOpen(f"{self.name} is unavailable")
+        if state == "half_open":
+            self._trial_running = True
+
+    def record_success(self, seconds: float | None = None) -> None:
+        if seconds is not None:
+            self.latency.observe(seconds)
+        if self.opened_at is not None:
+            logging.info(f"✅ {self.name} circuit closed.")
+            RESILIENCE_EVENTS.inc(dependency=self.name, event="closed")
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    def abandon(self) -> None:
+        """The call ended without an outcome (e.g. it was cancelled); let the next trial through."""
+        self._trial_running = False
+
+    def record_failure(self, error: BaseException) -> None:
+        self.failures += 1
+        self._trial_running = False
+        event = "timeout" if isinstance(error, asyncio.TimeoutError) else "error"
+        RESILIENCE_EVENTS.inc(dependency=self.name, event=event)
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                logging.warning(f"⚠️ {self.name} circuit opened after {self.failures} failures: {error!r}")
+                RESILIENCE_EVENTS.inc(dependency=self.name, event="opened")
+            self.opened_at = time.monotonic()
+
+    async def call(self, fetch: Callable[[], Awaitable[Any]], *, hedge: bool = False) -> Any:
+        """Run `fetch()` under the breaker and its timeout, optionally hedged (idempotent calls only)."""
+        self.before_call()
+        start = time.monotonic()
+        try:
+            if hedge and HEDGE_READS:
+                result = await asyncio.wait_for(self._hedged(fetch), self.timeout)
+            else:
+                result = await asyncio.wait_for(fetch(), self.timeout)
+        except asyncio.CancelledError:
+            self.abandon()
+            raise
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        self.record_success(time.monotonic() - start)
+        return result
+
+    async def _hedged(self, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        delay = max(HEDGE_MIN_DELAY, self.latency.percentile(95) or self.timeout)
+        tasks = [asyncio.ensure_future(fetch())]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                RESILIENCE_EVENTS.inc(dependency=self.name, event="hedged")
+                tasks.append(asyncio.ensure_future(fetch()))
+                pending = set(tasks)
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task.exception() is None:
+                            if task is tasks[1]:
+                                RESILIENCE_EVENTS.inc(dependency=self.name, event="hedge_won")
+                            return task.result()
+            # Either the first copy finished in time, or both failed and the original error is raised.
+            return tasks[0].result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+
+def guarded(breaker: CircuitBreaker, *, hedge: bool = False) -> Callable[[Callable], Callable]:
+    """Decorator routing every call of an async function through `breaker`."""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            return await breaker.call(lambda: func(*args, **kwargs), hedge=hedge)
+
+        return wrapper
+
+    return decorator
+
+
+# ✅ One breaker per external dependency, shared process-wide
+supabase_breaker = CircuitBreaker("supabase", timeout=SUPABASE_CALL_TIMEOUT)
+model_breaker = CircuitBreaker("gemini", timeout=MODEL_CALL_TIMEOUT)
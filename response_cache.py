@@ -0,0 +1,175 @@
+import os
+import re
+import math
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+
+from booking_lookup import BOOKING_UUID_RE, REFERENCE_NUMBER_RE
+
+# ✅ Cache settings
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "600"))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "500"))
+RESPONSE_CACHE_THRESHOLD = float(os.getenv("RESPONSE_CACHE_THRESHOLD", "0.8"))
+
+STOPWORDS = frozenset(
+    "a an the is are was were be do does did can could would will i me my we our you your "
+    "what which who whom how show list tell give get find see any some there please for of "
+    "to in on at with and or about have has it its this that these those".split()
+)
+WORD_RE = re.compile(r"[a-z0-9]+")
+EMAIL_RE = re.compile(r"\S+@\S+")
+# Negation and exclusion markers; "rooms not available" reads almost like "rooms available" by trigrams
+NEGATION_RE = re.compile(
+    r"\b(?:not|no|never|none|nor|neither|without|except|excluding|cannot)\b|n['’]t\b|\b(?:un|non-?)[a-z]{4,}",
+    re.IGNORECASE,
+)
+# Answer text that states prices or counts can go stale while the entry lives, so it is never stored
+VOLATILE_ANSWER_RE = re.compile(
+    r"\d|[$₱€£¥]|\b(?:php|usd|eur|pesos?|dollars?|cents?|"
+    r"one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|dozen|single|double|"
+    r"only|none|no rooms?|cheap\w*|expensive|afford\w*|budget|price[sd]?|cost\w*|rate[sd]?)\b",
+    re.IGNORECASE,
+)
+
+
+def normalize(question: str) -> str:
+    """Lowercase, strip punctuation and filler words so near-identical questions collide."""
+    return " ".join(word for word in WORD_RE.findall(question.lower()) if word not in STOPWORDS)
+
+
+def polarity(question: str) -> tuple[str, ...]:
+    """The question's negation markers ("n't" counts as "not"), which cached entries must match exactly."""
+    markers = []
+    for match in NEGATION_RE.finditer(question):
+        marker = match.group(0).lower()
+        markers.append("not" if marker in ("n't", "n’t") else marker)
+    return tuple(sorted(markers))
+
+
+def trigram_vector(text: str) -> Counter:
+    padded = f"  {text} "
+    return Counter(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def cosine(a: Counter, a_norm: float, b: Counter, b_norm: float) -> float:
+    if not a_norm or not b_norm:
+        return 0.0
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(count * b[gram] for gram, count in a.items()) / (a_norm * b_norm)
+
+
+@dataclass
+class CachedResponse:
+    """The model's answer plus which rooms it picked; room rows are re-read from the rooms cache on a hit."""
+
+    answer: str | None
+    room_numbers: list[str] | None
+    all_rooms: bool
+    numbers: tuple[str, ...]
+    negations: tuple[str, ...]
+    vector: Counter
+    norm: float
+    expires_at: float
+
+
+class ResponseCache:
+    """Similarity cache for general inquiries, keyed on normalized question text.
+
+    Exact normalized matches are O(1); otherwise the closest entry by character-trigram
+    cosine similarity is used if it clears `threshold`. Numbers in the question (guest
+    counts, room numbers) and negations ("not", "n't", "un-") must match exactly, and
+    questions that mention a specific booking or email are never cached.
+
+    Room rows are re-read on a hit but the answer text is replayed as-is, so answers
+    that quote prices, counts or price comparisons are not stored.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float = RESPONSE_CACHE_TTL,
+        max_entries: int = RESPONSE_CACHE_SIZE,
+        threshold: float = RESPONSE_CACHE_THRESHOLD,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self.volatile = 0
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+
+    @staticmethod
+    def cacheable(question: str) -> bool:
+        return not (
+            BOOKING_UUID_RE.search(question)
+            or REFERENCE_NUMBER_RE.search(question)
+            or EMAIL_RE.search(question)
+        )
+
+    @staticmethod
+    def replayable(answer: str | None) -> bool:
+        return answer is None or not VOLATILE_ANSWER_RE.search(answer)
+
+    def lookup(self, question: str) -> CachedResponse | None:
+        if not self.cacheable(question):
+            return None
+        key = normalize(question)
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= now:
+            entry = self._closest(key, polarity(question), now)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def store(self, question: str, answer: str | None, room_numbers: list[str] | None, all_rooms: bool) -> None:
+        if not self.cacheable(question):
+            return
+        if not self.replayable(answer):
+            self.volatile += 1
+            return
+        key = normalize(question)
+        vector = trigram_vector(key)
+        self._entries[key] = CachedResponse(
+            answer=answer,
+            room_numbers=room_numbers,
+            all_rooms=all_rooms,
+            numbers=tuple(sorted(w for w in key.split() if w.isdigit())),
+            negations=polarity(question),
+            vector=vector,
+            norm=math.sqrt(sum(c * c for c in vector.values())),
+            expires_at=time.monotonic() + self.ttl,
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "volatile": self.volatile, "size": len(self._entries)}
+
+    def _closest(self, key: str, negations: tuple[str, ...], now: float) -> CachedResponse | None:
+        vector = trigram_vector(key)
+        norm = math.sqrt(sum(c * c for c in vector.values()))
+        numbers = tuple(sorted(w for w in key.split() if w.isdigit()))
+        best, best_score = None, self.threshold
+        for cached_key, entry in list(self._entries.items()):
+            if entry.expires_at <= now:
+                del self._entries[cached_key]
+                continue
+            if entry.numbers != numbers or entry.negations != negations:
+                continue
+            score = cosine(vector, norm, entry.vector, entry.norm)
+            if score >= best_score:
+                best, best_score = entry, score
+        return best
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,33 @@
+import os
+import logging
+from typing import Any
+
+from cache import AsyncTTLCache
+from repository import get_repository
+
+# ✅ Room inventory rarely changes, so every agent run shares one cached copy of the available rooms.
+ROOMS_CACHE_TTL = float(os.getenv("ROOMS_CACHE_TTL", "30"))
+# How long past expiry the last good room list may still be served while Supabase is failing
+ROOMS_STALE_TTL = float(os.getenv("ROOMS_STALE_TTL", "600"))
+AVAILABLE_ROOMS_KEY = "available_rooms"
+
+rooms_cache = AsyncTTLCache(ttl=ROOMS_CACHE_TTL, stale_ttl=ROOMS_STALE_TTL)
+
+
+async def available_rooms() -> list[dict[str, Any]]:
+    """Return available rooms ordered by price, cheapest first.
+
+    The returned rows are shared between callers and must not be mutated.
+    """
+
+    async def fetch() -> list[dict[str, Any]]:
+        logging.info("🔄 Rooms cache miss, querying Supabase.")
+        return await get_repository().list_available_rooms()
+
+    return await rooms_cache.get_or_fetch(AVAILABLE_ROOMS_KEY, fetch)
+
+
+def invalidate_rooms() -> None:
+    """Call whenever a booking is created/changed or a room's status changes."""
+    rooms_cache.invalidate(AVAILABLE_ROOMS_KEY)
+    logging.info("🧹 Rooms cache invalidated.")
@@ -0,0 +1,77 @@
+"""Production entry point: the FastHTML app under multi-worker uvicorn.
+
+    python server.py                      # WEB_CONCURRENCY workers on HOST:PORT
+    uvicorn server:create_app --factory --workers 4
+    gunicorn "server:create_app()" -k uvicorn.workers.UvicornWorker -w 4
+
+Each worker process imports the app on its own and builds its own Gemini client,
+Supabase pool and caches in the app's startup hook, so nothing is shared across
+forks. On SIGTERM a worker stops accepting connections, waits up to
+GRACEFUL_TIMEOUT for open requests (including streamed answers) to finish, then
+drains any remaining agent runs and flushes the conversation log before exiting.
+
+Caches, rate limits and /metrics counters are per worker; scrape /metrics as a
+per-instance target and sum across workers.
+"""
+
+import os
+import logging
+
+import uvicorn
+from dotenv import load_dotenv
+from fasthtml.core import get_key
+
+from log_config import configure_logging
+
+# ✅ Load environment variables
+load_dotenv()
+
+# ✅ Set up logging
+configure_logging()
+
+# ✅ Server settings
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "5001"))
+WORKERS = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+KEEP_ALIVE = int(os.getenv("KEEP_ALIVE", "5"))
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+# Connections a worker serves at once before answering 503; unset means unlimited
+WORKER_CONNECTIONS = int(os.getenv("WORKER_CONNECTIONS", "0")) or None
+# Proxies trusted for X-Forwarded-For / X-Forwarded-Proto
+FORWARDED_ALLOW_IPS = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "info")
+
+
+def create_app():
+    """ASGI app factory; called once in each worker process."""
+    from main import app
+
+    logging.info(f"✅ Worker {os.getpid()} loaded the app.")
+    return app
+
+
+def run() -> None:
+    # Every worker must sign sessions with the same key: without SESSION_SECRET, create the
+    # .sesskey file once here rather than letting the workers race to create their own.
+    get_key(os.getenv("SESSION_SECRET"))
+    logging.info("🚀 Serving on %s:%d with %d workers.", HOST, PORT, WORKERS)
+    uvicorn.run(
+        "server:create_app",
+        factory=True,
+        host=HOST,
+        port=PORT,
+        workers=WORKERS,
+        timeout_keep_alive=KEEP_ALIVE,
+        timeout_graceful_shutdown=GRACEFUL_TIMEOUT,
+        limit_concurrency=WORKER_CONNECTIONS,
+        proxy_headers=True,
+        forwarded_allow_ips=FORWARDED_ALLOW_IPS,
+        log_level=LOG_LEVEL,
+        # Leave logging to configure_logging(), so uvicorn's own and access logs go through the same queue.
+        log_config=None,
+        lifespan="on",
+    )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,141 @@
+import os
+import re
+import asyncio
+import logging
+from collections import OrderedDict
+from pathlib import Path
+
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelMessagesTypeAdapter,
+    ModelRequest,
+    SystemPromptPart,
+    UserPromptPart,
+)
+
+# ✅ Memory settings
+SESSION_MEMORY_MAX_SESSIONS = int(os.getenv("SESSION_MEMORY_MAX_SESSIONS", "1000"))
+SESSION_MEMORY_TOKEN_BUDGET = int(os.getenv("SESSION_MEMORY_TOKEN_BUDGET", "2000"))
+SESSION_MEMORY_DIR = os.getenv("SESSION_MEMORY_DIR")
+
+# Rough chars-per-token ratio; good enough to keep prompts inside a budget without a tokenizer.
+CHARS_PER_TOKEN = 4
+SESSION_ID_RE = re.compile(r"[0-9a-f]{32}")
+
+
+def estimate_tokens(messages: list[ModelMessage]) -> int:
+    return len(ModelMessagesTypeAdapter.dump_json(messages)) // CHARS_PER_TOKEN
+
+
+def split_turns(messages: list[ModelMessage]) -> list[list[ModelMessage]]:
+    """Group messages into turns, each starting with the request that carries the user's prompt."""
+    turns: list[list[ModelMessage]] = []
+    for message in messages:
+        starts_turn = isinstance(message, ModelRequest) and any(
+            isinstance(part, UserPromptPart) for part in message.parts
+        )
+        if starts_turn or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def compact(messages: list[ModelMessage], token_budget: int) -> list[ModelMessage]:
+    """Drop the oldest whole turns until the history fits in `token_budget`.
+
+    The latest turn is always kept, and the system prompt from the first request is
+    carried over so later runs still see it.
+    """
+    turns = split_turns(messages)
+    if len(turns) <= 1 or estimate_tokens(messages) <= token_budget:
+        return messages
+
+    first = messages[0]
+    system_parts = [part for part in first.parts if isinstance(part, SystemPromptPart)] if isinstance(first, ModelRequest) else []
+
+    sizes = [estimate_tokens(turn) for turn in turns]
+    total = sum(sizes)
+    dropped = 0
+    while dropped < len(turns) - 1 and total > token_budget:
+        total -= sizes[dropped]
+        dropped += 1
+
+    kept = [message for turn in turns[dropped:] for message in turn]
+    if system_parts:
+        head = kept[0]
+        kept[0] = ModelRequest(parts=[*system_parts, *(p for p in head.parts if not isinstance(p, SystemPromptPart))])
+    logging.debug(f"✂️ Compacted history: dropped {dropped} of {len(turns)} turns.")
+    return kept
+
+
+class SessionMemory:
+    """Per-session message history, LRU-bounded in memory with optional on-disk backing.
+
+    Histories are compacted to `token_budget` on every write, so prompt size stays flat
+    however long a visitor chats. Sessions evicted from memory are reloaded from disk
+    when a `directory` is configured.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_sessions: int = SESSION_MEMORY_MAX_SESSIONS,
+        token_budget: int = SESSION_MEMORY_TOKEN_BUDGET,
+        directory: str | Path | None = SESSION_MEMORY_DIR,
+    ):
+        self.max_sessions = max_sessions
+        self.token_budget = token_budget
+        self.directory = Path(directory) if directory else None
+        self._sessions: OrderedDict[str, list[ModelMessage]] = OrderedDict()
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    async def get(self, session_id: str) -> list[ModelMessage]:
+        if (history := self._sessions.get(session_id)) is not None:
+            self._sessions.move_to_end(session_id)
+            return history
+        history = await asyncio.to_thread(self._load, session_id) if self.directory else []
+        self._remember(session_id, history)
+        return history
+
+    async def append(self, session_id: str, new_messages: list[ModelMessage]) -> None:
+        history = compact([*await self.get(session_id), *new_messages], self.token_budget)
+        self._remember(session_id, history)
+        if self.directory:
+            await asyncio.to_thread(self._save, session_id, history)
+
+    def clear(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+        if path := self._path(session_id):
+            path.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _remember(self, session_id: str, history: list[ModelMessage]) -> None:
+        self._sessions[session_id] = history
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def _path(self, session_id: str) -> Path | None:
+        if self.directory and SESSION_ID_RE.fullmatch(session_id):
+            return self.directory / f"{session_id}.json"
+        return None
+
+    def _load(self, session_id: str) -> list[ModelMessage]:
+        path = self._path(session_id)
+        if not path or not path.exists():
+            return []
+        try:
+            return ModelMessagesTypeAdapter.validate_json(path.read_bytes())
+        except Exception as e:
+            logging.warning(f"⚠️ Discarding unreadable history for session {session_id}: {e}")
+            return []
+
+    def _save(self, session_id: str, history: list[ModelMessage]) -> None:
+        if path := self._path(session_id):
+            path.write_bytes(ModelMessagesTypeAdapter.dump_json(history))
+
+
+session_memory = SessionMemory()
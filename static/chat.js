@@ -0,0 +1,76 @@
+// Chat widget for the inquiry and booking pages (see ChatbotUI in main.py).
+
+async function fetchData(api, param) {
+    let inputField = document.getElementById('user-input');
+    let userInput = inputField.value.trim();
+    let chatWindow = document.getElementById('chat-window');
+
+    if (!userInput) {
+        chatWindow.innerHTML += "<div class='p-2 bg-red-100 rounded-lg my-1'>❌ Please enter a value.</div>";
+        return;
+    }
+
+    chatWindow.innerHTML += `<div class='p-2 bg-gray-100 rounded-lg my-1'>🗣️ You: ${userInput}</div>`;
+    chatWindow.innerHTML += "<div class='p-2 bg-gray-100 rounded-lg my-1'>🔄 Fetching response...</div>";
+
+    let response = await fetch(`/${api}?${param}=${encodeURIComponent(userInput)}`);
+    let data = await response.json();
+
+    chatWindow.innerHTML += `<div class='p-2 bg-blue-100 rounded-lg my-1'>${data.answer || "No data found."}</div>`;
+    if (data.booking) {
+        let details = document.createElement('ul');
+        details.className = 'list-disc pl-5 mt-1';
+        details.replaceChildren(...Object.entries(data.booking).map(([key, value]) => {
+            let item = document.createElement('li');
+            item.textContent = `${key.replaceAll('_', ' ')}: ${value}`;
+            return item;
+        }));
+        chatWindow.appendChild(details);
+    }
+}
+
+function streamData(api, param) {
+    let inputField = document.getElementById('user-input');
+    let userInput = inputField.value.trim();
+    let chatWindow = document.getElementById('chat-window');
+
+    if (!userInput) {
+        chatWindow.innerHTML += "<div class='p-2 bg-red-100 rounded-lg my-1'>❌ Please enter a value.</div>";
+        return;
+    }
+
+    chatWindow.innerHTML += `<div class='p-2 bg-gray-100 rounded-lg my-1'>🗣️ You: ${userInput}</div>`;
+    let answer = document.createElement('div');
+    answer.className = 'p-2 bg-blue-100 rounded-lg my-1';
+    answer.textContent = "🔄 Fetching response...";
+    let roomList = document.createElement('ul');
+    roomList.className = 'list-disc pl-5 mt-1';
+    chatWindow.appendChild(answer);
+    chatWindow.appendChild(roomList);
+
+    function renderRooms(rooms) {
+        roomList.replaceChildren(...rooms.map(room => {
+            let item = document.createElement('li');
+            item.textContent = `Room ${room.room_number} (${room.room_type}) - up to ${room.max_guests} guests, ${room.price_per_night}/night`;
+            return item;
+        }));
+    }
+
+    let source = new EventSource(`/${api}?${param}=${encodeURIComponent(userInput)}`);
+    source.addEventListener('rooms', e => renderRooms(JSON.parse(e.data).rooms || []));
+    source.addEventListener('answer', e => {
+        let data = JSON.parse(e.data);
+        if (data.answer) answer.textContent = data.answer;
+    });
+    source.addEventListener('done', e => {
+        let data = JSON.parse(e.data);
+        answer.textContent = data.answer || "No data found.";
+        if (data.rooms) renderRooms(data.rooms);
+        source.close();
+    });
+    source.addEventListener('error', e => {
+        // A refused connection (e.g. 429 when rate limited) arrives as an error without data.
+        answer.textContent = e.data ? JSON.parse(e.data).answer : "⚠️ We're handling a lot of questions right now. Please try again in a moment.";
+        source.close();
+    });
+}
@@ -0,0 +1,118 @@
+import json
+import logging
+from collections.abc import AsyncIterator, Collection
+from typing import Any
+
+from pydantic import BaseModel, ValidationError
+from pydantic_ai import Agent
+from pydantic_ai.agent import AgentRunResult
+from pydantic_ai.messages import (
+    FunctionToolResultEvent,
+    ModelRequest,
+    ModelResponse,
+    TextPart,
+    ToolCallPart,
+    ToolReturnPart,
+)
+
+from log_config import sampled
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format a single server-sent event with a JSON payload."""
+    if isinstance(data, BaseModel):
+        payload = data.model_dump_json()
+    else:
+        payload = json.dumps(data)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+async def stream_agent_events(
+    agent: Agent, user_prompt: str, *, terminal_tools: Collection[str] = (), **run_kwargs: Any
+) -> AsyncIterator[tuple[str, Any]]:
+    """Drive `agent` node by node and yield events as soon as they are available.
+
+    Yields `(kind, payload)` tuples:
+      - ("tool", ToolReturnPart)  as soon as a function tool returns
+      - ("partial", result)       for each partially validated structured result
+      - ("result", AgentRunResult) once the run has finished
+
+    Tools named in `terminal_tools` end the run as soon as they return, provided nothing
+    else was called in the same response: their return value becomes the result as-is
+    instead of being sent back to the model to re-emit.
+    """
+    async with agent.iter(user_prompt, **run_kwargs) as agent_run:
+        async for node in agent_run:
+            if Agent.is_model_request_node(node):
+                async with node.stream(agent_run.ctx) as model_stream:
+                    try:
+                        async for partial in model_stream.stream_output(debounce_by=0.05):
+                            yield "partial", partial
+                    except ValidationError:
+                        # Partial JSON that can't be validated yet; the final result is validated below.
+                        logging.debug("⏳ Skipping unvalidated partial result.")
+            elif Agent.is_call_tools_node(node):
+                tool_results = []
+                async with node.stream(agent_run.ctx) as tool_events:
+                    async for event in tool_events:
+                        if isinstance(event, FunctionToolResultEvent):
+                            tool_results.append(event.result)
+                            if isinstance(event.result, ToolReturnPart):
+                                yield "tool", event.result
+
+                if terminal_tools and (result := _terminal_result(agent_run, node.model_response, tool_results, terminal_tools)):
+                    yield "result", result
+                    return
+
+        yield "result", agent_run.result
+
+
+def _terminal_result(
+    agent_run, model_response: ModelResponse, tool_results: list, terminal_tools: Collection[str]
+) -> AgentRunResult | None:
+    """Turn a terminal tool's return value into the run's final result, if one was called.
+
+    This reads run internals (`ctx.deps.result_schema`, `ctx.state`) and builds
+    AgentRunResult positionally, none of which pydantic_ai exposes publicly, hence the
+    version pin in requirements.txt. If they change shape, the run falls back to the
+    normal second model pass instead of failing.
+    """
+    try:
+        result_schema = agent_run.ctx.deps.result_schema
+        history = agent_run.ctx.state.message_history
+        new_message_index = agent_run.ctx.deps.new_message_index
+    except AttributeError as e:
+        logging.error("❌ Terminal tools disabled, pydantic_ai run internals changed: %r", e)
+        return None
+
+    result_tool_names = set(result_schema.tools) if result_schema is not None else set()
+    tool_names = {p.tool_name for p in model_response.parts if isinstance(p, ToolCallPart)}
+    if tool_names & result_tool_names:
+        # The model produced its own final result in the same response; let the normal path handle it.
+        return None
+    if not tool_names <= set(terminal_tools):
+        # Other tools ran alongside (e.g. a booking lookup next to the room list); the model combines them.
+        return None
+
+    terminal = next(
+        (r for r in tool_results if isinstance(r, ToolReturnPart) and r.tool_name in terminal_tools), None
+    )
+    if terminal is None:
+        return None
+
+    data = terminal.content
+    narrative = " ".join(p.content for p in model_response.parts if isinstance(p, TextPart) and p.content).strip()
+    if narrative and isinstance(data, BaseModel) and "answer" in type(data).model_fields:
+        data = data.model_copy(update={"answer": narrative})
+
+    try:
+        result = AgentRunResult(data, None, agent_run.ctx.state, new_message_index)
+    except TypeError as e:
+        logging.error("❌ Terminal tools disabled, AgentRunResult signature changed: %r", e)
+        return None
+
+    # Close the turn so the stored history stays well-formed: tool returns, then a short model reply.
+    history.append(ModelRequest(parts=tool_results))
+    history.append(ModelResponse(parts=[TextPart(content=narrative or f"Returned the result of {terminal.tool_name}.")]))
+    logging.info("⚡ %s ended the run without a second model pass.", terminal.tool_name, extra=sampled())
+    return result
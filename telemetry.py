@@ -0,0 +1,288 @@
+import os
+import json
+import time
+import logging
+import functools
+import inspect
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from opentelemetry import trace
+from pydantic import BaseModel
+
+# ✅ Tracing settings
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "hanapbahay-agent")
+# Finished spans are appended here as OpenTelemetry JSON, one per line (requires opentelemetry-sdk)
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH")
+# Standard OTLP/HTTP endpoint, e.g. http://localhost:4318 (requires opentelemetry-exporter-otlp-proto-http)
+OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+tracer = trace.get_tracer("hanapbahay")
+
+
+class Counter:
+    """Prometheus counter keyed by label values."""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels[label]) for label in self.labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{{{_labels(self.labels, key)}}} {value:g}")
+        return lines
+
+
+class Histogram:
+    """Prometheus histogram with fixed buckets, keyed by label values."""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...], buckets: tuple[float, ...] = DURATION_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        # label values -> [count per bucket..., +Inf count, sum]
+        self._series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[label]) for label in self.labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += 1
+        series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self._series.items()):
+            labels = _labels(self.labels, key)
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound:g}"}} {count:g}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {series[-2]:g}')
+            lines.append(f"{self.name}_sum{{{labels}}} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {series[-2]:g}")
+        return lines
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    escaped = (value.replace("\\", r"\\").replace('"', r'\"').replace("\n", r"\n") for value in values)
+    return ",".join(f'{name}="{value}"' for name, value in zip(names, escaped))
+
+
+# ✅ Metrics exposed on /metrics; `kind` is one of http, agent, model, tool, db
+SPAN_DURATION = Histogram("hanapbahay_span_duration_seconds", "Duration of traced operations.", ("kind", "name", "status"))
+TOKENS = Counter("hanapbahay_tokens_total", "Model tokens used.", ("kind", "name", "direction"))
+PAYLOAD_BYTES = Counter("hanapbahay_payload_bytes_total", "Payload bytes returned by traced operations.", ("kind", "name"))
+ROWS = Counter("hanapbahay_db_rows_total", "Rows returned by database calls.", ("name",))
+ADMISSIONS = Counter(
+    "hanapbahay_admission_total",
+    "Chat requests by admission outcome (admitted, rate_limited_*, overloaded, budget_exceeded).",
+    ("endpoint", "outcome"),
+)
+RESILIENCE_EVENTS = Counter(
+    "hanapbahay_resilience_events_total",
+    "Circuit breaker and hedging events per dependency (error, timeout, opened, closed, rejected, hedged, hedge_won).",
+    ("dependency", "event"),
+)
+INTENT_ROUTES = Counter(
+    "hanapbahay_intent_routes_total",
+    "Inquiry questions by predicted intent and whether they were answered locally (answered) or sent to the model.",
+    ("intent", "outcome"),
+)
+METRICS = [SPAN_DURATION, TOKENS, PAYLOAD_BYTES, ROWS, ADMISSIONS, RESILIENCE_EVENTS, INTENT_ROUTES]
+
+
+def render_metrics() -> str:
+    return "\n".join(line for metric in METRICS for line in metric.render()) + "\n"
+
+
+class Span:
+    """A traced operation; attributes set here go to the OpenTelemetry span and to /metrics."""
+
+    def __init__(self, kind: str, name: str, otel_span: trace.Span):
+        self.kind = kind
+        self.name = name
+        self.otel_span = otel_span
+        self.attributes: dict[str, Any] = {}
+
+    def set(self, **attributes: Any) -> None:
+        for key, value in attributes.items():
+            if value is None:
+                continue
+            self.attributes[key] = value
+            self.otel_span.set_attribute(key, value)
+
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+@contextmanager
+def span(kind: str, name: str, **attributes: Any) -> Iterator[Span]:
+    """Trace one operation: an OpenTelemetry span plus duration, token and payload metrics."""
+    start = time.perf_counter()
+    status = "ok"
+    with tracer.start_as_current_span(f"{kind} {name}", attributes={"kind": kind}) as otel_span:
+        record = Span(kind, name, otel_span)
+        record.set(**attributes)
+        token = _current_span.set(record)
+        try:
+            yield record
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            _current_span.reset(token)
+            duration = time.perf_counter() - start
+            record.set(duration_ms=round(duration * 1000, 3))
+            SPAN_DURATION.observe(duration, kind=kind, name=record.name, status=status)
+            _record_counters(record)
+
+
+def _record_counters(record: Span) -> None:
+    attributes = record.attributes
+    for direction in ("request", "response"):
+        if tokens := attributes.get(f"tokens.{direction}"):
+            TOKENS.inc(tokens, kind=record.kind, name=record.name, direction=direction)
+    if payload := attributes.get("payload.bytes"):
+        PAYLOAD_BYTES.inc(payload, kind=record.kind, name=record.name)
+    if record.kind == "db" and (rows := attributes.get("db.rows")) is not None:
+        ROWS.inc(rows, name=record.name)
+
+
+def record_usage(record: Span, usage: Any) -> None:
+    """Copy token counts from a pydantic_ai `Usage` onto a span."""
+    record.set(**{
+        "tokens.request": usage.request_tokens,
+        "tokens.response": usage.response_tokens,
+        "model.requests": usage.requests,
+    })
+
+
+def payload_size(value: Any) -> int:
+    if isinstance(value, BaseModel):
+        return len(value.model_dump_json())
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    return len(json.dumps(value, default=str))
+
+
+def traced(kind: str) -> Callable[[Callable], Callable]:
+    """Decorator that traces each call of a tool or data-layer function under its own name.
+
+    Signatures are preserved, so it can sit under `@agent.tool` without changing the tool schema.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        name = func.__name__
+
+        def annotate(record: Span, result: Any) -> None:
+            if kind == "db":
+                # Response bytes come from the HTTP client hook (record_response_size).
+                record.set(**{"db.rows": len(result) if isinstance(result, list) else int(result is not None)})
+            else:
+                record.set(**{"payload.bytes": payload_size(result)})
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with span(kind, name) as record:
+                    result = await func(*args, **kwargs)
+                    annotate(record, result)
+                    return result
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(kind, name) as record:
+                result = func(*args, **kwargs)
+                annotate(record, result)
+                return result
+
+        return wrapper
+
+    return decorator
+
+
+async def record_response_size(response: Any) -> None:
+    """httpx response hook: add the body size to whichever span made the request."""
+    if (record := current_span()) is not None and (length := response.headers.get("content-length")):
+        record.set(**{"payload.bytes": record.attributes.get("payload.bytes", 0) + int(length)})
+
+
+class TracingMiddleware:
+    """ASGI middleware that traces every HTTP request, including streamed responses, end to end."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        response_status = 500
+
+        async def send_with_status(message):
+            nonlocal response_status
+            if message["type"] == "http.response.start":
+                response_status = message["status"]
+            await send(message)
+
+        path = scope["path"]
+        with span("http", path, **{"http.method": scope["method"]}) as record:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                record.set(**{"http.status_code": response_status})
+                if response_status == 404:
+                    # Keep unmatched paths out of the metric labels.
+                    record.name = "unmatched"
+
+
+def configure_tracing() -> None:
+    """Export spans through the OpenTelemetry SDK when an exporter is configured.
+
+    Without one (or without the SDK) spans are still timed and counted for /metrics.
+    """
+    if not TRACE_EXPORT_PATH and not OTLP_ENDPOINT:
+        return
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    except ImportError:
+        logging.warning("⚠️ opentelemetry-sdk is not installed; spans are only counted in /metrics.")
+        return
+
+    provider = TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME}))
+    if TRACE_EXPORT_PATH:
+        out = open(TRACE_EXPORT_PATH, "a", encoding="utf-8")
+        exporter = ConsoleSpanExporter(out=out, formatter=lambda s: s.to_json(indent=None) + "\n")
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+    if OTLP_ENDPOINT:
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            logging.warning("⚠️ OTLP exporter is not installed; skipping OTEL_EXPORTER_OTLP_ENDPOINT.")
+        else:
+            provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(provider)
+    logging.info(f"✅ Tracing configured for {SERVICE_NAME}.")
@@ -3,34 +3,20 @@ import asyncio
 import logging
 import nest_asyncio
 from dotenv import load_dotenv
-from supabase import create_client, Client
 from pydantic import BaseModel
 from pydantic_ai import Agent, RunContext, Tool
-from pydantic_ai.models.gemini import GeminiModel
-from pydantic_ai.providers.google_gla import GoogleGLAProvider
+
+from booking_loader import get_booking
+from log_config import configure_logging, summarize
+from registry import LazyModel
+from repository import close_repository
+from telemetry import traced
 
 # ✅ Load environment variables
 load_dotenv()
-nest_asyncio.apply()
-
-# ✅ Set up logging
-logging.basicConfig(
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    level=logging.INFO,  # Change to DEBUG for detailed logs
-)
-
-# ✅ Initialize Supabase client
-SUPABASE_URL = os.getenv("supa_url")
-SUPABASE_KEY = os.getenv("supa_key")
 
-def initialize_supabase():
-    if not SUPABASE_URL or not SUPABASE_KEY:
-        logging.critical("❌ Supabase credentials are missing! Check environment variables.")
-        raise ValueError("Supabase credentials are missing!")
-    logging.info("✅ Supabase client initialized successfully.")
-    return create_client(SUPABASE_URL, SUPABASE_KEY)
-
-supabase: Client = initialize_supabase()
+# ✅ Set up logging (LOG_LEVEL=debug for detailed logs)
+configure_logging()
 
 # ✅ Define Pydantic models
 class BookingRequest(BaseModel):
@@ -55,13 +41,9 @@ class ResponseModel(BaseModel):
     booking: BookingData | None = None
     message: str
 
-# ✅ Initialize Gemini Model
-gem_api = os.getenv("API_KEY")
-model = GeminiModel("gemini-2.0-flash", provider=GoogleGLAProvider(api_key=gem_api))
-
 # ✅ Create AI Agent
 agent = Agent(
-    model=model,
+    model=LazyModel(),
     result_type=ResponseModel,
     system_prompt=(
         "You are an AI agent that fetches booking details from Supabase. "
@@ -70,32 +52,29 @@ agent = Agent(
 )
 
 @agent.tool
+@traced("tool")
 async def get_booking_by_id(ctx: RunContext[BookingRequest]) -> ResponseModel:
     """Fetch a specific booking using the provided booking ID."""
     logging.info("🛠️ get_booking_by_id tool called!")
 
     try:
         booking_id = ctx.deps.booking_id
-        logging.debug(f"🔍 Fetching booking with ID: {booking_id}")
+        logging.debug("🔍 Fetching booking with ID: %s", booking_id)
 
-        # ✅ Run Supabase query in a separate thread
-        response = await asyncio.to_thread(
-            lambda: supabase.from_("bookings").select("*").eq("id", booking_id).maybe_single().execute()
-        )
+        booking_data = await get_booking(booking_id)
 
-        logging.debug(f"📜 Raw Supabase Response: {response}")
+        logging.debug("📜 Raw Supabase Response: %s", summarize(booking_data))
 
-        if not response.data:
+        if not booking_data:
             logging.warning("⚠️ No booking found in database.")
             return ResponseModel(booking=None, message="No booking found")
 
-        booking_data = response.data
-        logging.info(f"✅ Booking Found: {booking_data}")
+        logging.info("✅ Booking Found: %s", summarize(booking_data))
 
         # ✅ Parse booking data safely
         try:
-            parsed_data = BookingData(**{key: booking_data.get(key) for key in BookingData.model_fields})
-            logging.debug(f"✅ Parsed Booking Data: {parsed_data}")
+            parsed_data = BookingData.model_validate(booking_data)
+            logging.debug("✅ Parsed Booking Data: %s", summarize(parsed_data))
             return ResponseModel(booking=parsed_data, message="Booking retrieved successfully")
         except Exception as parse_error:
             logging.error(f"❌ Error parsing booking data: {parse_error}")
@@ -127,13 +106,18 @@ async def main():
         # ✅ Print usage statistics safely
         usage_info = result.usage()
         logging.info(f"📊 Usage Info: {usage_info}")  
-        if hasattr(usage_info, "tokens_used"):
-            logging.info(f"📥 Tokens Used: {usage_info.tokens_used}")
+        logging.info(
+            f"📥 Tokens Used: {usage_info.total_tokens} "
+            f"(request {usage_info.request_tokens}, response {usage_info.response_tokens})"
+        )
 
     except Exception as e:
         logging.critical(f"❌ Critical error in main function: {e}", exc_info=True)
+    finally:
+        await close_repository()
 
 if __name__ == "__main__":
+    nest_asyncio.apply()
     logging.info("⚡ Running async main function...")  
     asyncio.run(main())
     logging.info("✅ Script execution completed!")
\ No newline at end of file
@@ -0,0 +1,11 @@
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# Tests import the flat top-level modules and the stand-ins in bench/, as the benchmarks do.
+sys.path[:0] = [str(ROOT), str(ROOT / "bench")]
+# Placeholder credentials so modules that read them at import time load; every test points at a local stand-in.
+os.environ.setdefault("supa_url", "http://127.0.0.1:9")
+os.environ.setdefault("supa_key", "test-key")
+os.environ.setdefault("LOG_FORMAT", "text")
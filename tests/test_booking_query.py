@@ -0,0 +1,42 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import main
+
+BOOKING_ID = "0b4d20c8-1a1a-45eb-b7f8-005a97981cbe"
+
+
+@pytest.fixture
+def agent_deps(monkeypatch):
+    """Deps each booking question hands the agent; the run itself fails right after."""
+    seen = []
+
+    async def run(prompt, deps, **kwargs):
+        seen.append(deps)
+        raise RuntimeError("model not called in tests")
+
+    monkeypatch.setattr(main.agent, "run", run)
+    return seen
+
+
+@pytest.mark.parametrize(
+    "question, booking_id",
+    [
+        ("when do I check out?", None),
+        (f"when do I check out of {BOOKING_ID.upper()}?", BOOKING_ID),
+    ],
+)
+def test_only_an_extracted_id_reaches_the_agent(agent_deps, question, booking_id):
+    asyncio.run(main.answer_booking_query(question, "test-session"))
+
+    [deps] = agent_deps
+    assert deps.booking_id == booking_id
+
+
+def test_tool_asks_for_a_booking_id_when_none_was_given():
+    answer = asyncio.run(main.get_booking_by_id(SimpleNamespace(deps=main.BookingRequest())))
+
+    assert answer.answer == "Please provide your booking ID or reference number."
+    assert answer.booking is None
@@ -0,0 +1,72 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+import availability
+import db_changes
+from availability import OCCUPANCY_KEY, OccupancyIndex
+from cache import AsyncTTLCache
+
+SECRET = "test-secret"
+ROOM = {"id": 1, "room_number": "101", "status": "Available", "max_guests": 2, "price_per_night": 1000}
+
+
+@pytest.fixture
+def index(monkeypatch):
+    """An occupancy index for one empty room, already cached as the webhook would find it."""
+    monkeypatch.setattr(db_changes, "DB_WEBHOOK_SECRET", SECRET)
+    monkeypatch.setattr(availability, "occupancy_cache", AsyncTTLCache(ttl=60))
+    index = OccupancyIndex([ROOM], [], date.today())
+
+    async def build():
+        return index
+
+    asyncio.run(availability.occupancy_cache.get_or_fetch(OCCUPANCY_KEY, build))
+    return index
+
+
+@pytest.fixture
+def client():
+    app = Starlette(routes=[Route("/api/db/changes", db_changes.webhook, methods=["POST"])])
+    with TestClient(app) as client:
+        yield client
+
+
+def post(client, change):
+    return client.post("/api/db/changes", json=change, headers={"X-Webhook-Secret": SECRET})
+
+
+def booking(**fields):
+    today = date.today()
+    return {"id": 7, "room_id": ROOM["id"], "status": "Confirmed",
+            "check_in_date": str(today + timedelta(days=1)), "check_out_date": str(today + timedelta(days=3)), **fields}
+
+
+def test_new_booking_updates_the_index(index, client):
+    response = post(client, {"type": "INSERT", "table": "bookings", "record": booking()})
+
+    assert response.status_code == 204
+    assert availability.occupancy_cache.peek(OCCUPANCY_KEY) is index
+    assert len(index) == 1
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        {"type": "INSERT", "table": "bookings", "record": None},
+        {"type": "INSERT", "table": "bookings", "record": booking(id=None)},
+        {"type": "UPDATE", "table": "bookings", "record": {"id": 7, "room_id": 1}},
+        {"type": "UPDATE", "table": "bookings", "record": booking(check_in_date="next friday")},
+        {"type": "UPDATE", "table": "bookings", "record": booking(check_out_date=20261020)},
+        {"type": "DELETE", "table": "bookings", "old_record": {"room_id": 1}},
+    ],
+)
+def test_malformed_booking_rebuilds_the_index(index, client, change):
+    response = post(client, change)
+
+    assert response.status_code == 400
+    assert availability.occupancy_cache.peek(OCCUPANCY_KEY) is None
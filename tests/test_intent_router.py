@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from fake_postgrest import seed
+from intent_router import PRICE_CURRENCY, build_router
+
+ROOMS = sorted(
+    (room for room in seed(rooms=20, bookings=0)["rooms"] if room["status"] == "Available"),
+    key=lambda room: room["price_per_night"],
+)
+
+
+@pytest.fixture(scope="module")
+def router():
+    return build_router()
+
+
+def route(router, question: str):
+    async def rooms():
+        return ROOMS
+
+    return asyncio.run(router.route(question, rooms))
+
+
+@pytest.mark.parametrize(
+    "question, intent",
+    [
+        ("what rooms are available", "list_rooms"),
+        ("cheapest room", "cheapest_room"),
+        ("least expensive room", "cheapest_room"),
+        ("what is the most expensive room", "most_expensive_room"),
+        ("rooms for 4 guests", "rooms_for_guests"),
+        (f"how many guests fit in room {ROOMS[0]['room_number']}", "room_capacity"),
+        (f"do you have {ROOMS[0]['room_type'].lower()} rooms?", "room_type"),
+    ],
+)
+def test_answers_simple_questions(router, question, intent):
+    routed = route(router, question)
+
+    assert routed is not None
+    assert routed.intent == intent
+    assert routed.rooms
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        # Price bounds
+        "show rooms under 100",
+        "cheapest room under $50",
+        "which room is cheaper than 3000",
+        # Amenities
+        "list rooms with wifi",
+        "cheapest room with a balcony",
+        # Negation
+        "I don't want the cheapest room",
+        "not the cheapest room",
+        "rooms except suites",
+        # A second intent
+        "rooms for 3 guests cheapest",
+        "cheapest and most expensive room",
+        "rooms for 2 adults and 2 kids",
+        # Dates
+        "any suites available this weekend?",
+    ],
+)
+def test_defers_constraints_it_cannot_evaluate(router, question):
+    assert route(router, question) is None
+
+
+def test_prices_name_the_currency(router):
+    routed = route(router, "cheapest room")
+
+    assert routed.answer == f"Our cheapest room is {PRICE_CURRENCY} {ROOMS[0]['price_per_night']:,.2f} per night:"
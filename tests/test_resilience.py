@@ -0,0 +1,205 @@
+import asyncio
+import time
+from datetime import date, timedelta
+
+import pytest
+from starlette.testclient import TestClient
+
+import registry
+import repository
+import rooms
+from cache import AsyncTTLCache
+from fake_model import Faults, fake_gemini
+from fake_postgrest import BackgroundServer, FakePostgREST, seed
+from repository import create_repository
+from resilience import CircuitBreaker, CircuitOpen, LatencyTracker, model_breaker, supabase_breaker
+from telemetry import RESILIENCE_EVENTS
+
+
+class Draws:
+    """Stands in for the fake's random.Random so a test decides which requests are faulty."""
+
+    def __init__(self, *values: float):
+        self.values = list(values)
+
+    def random(self) -> float:
+        return self.values.pop(0) if self.values else 1.0
+
+
+def events(dependency: str, event: str) -> float:
+    return RESILIENCE_EVENTS._values.get((dependency, event), 0)
+
+
+def reset(breaker: CircuitBreaker) -> None:
+    breaker.failures = 0
+    breaker.opened_at = None
+    breaker._trial_running = False
+    breaker.latency = LatencyTracker()
+
+
+@pytest.fixture
+def db():
+    fake = FakePostgREST(seed(rooms=10, bookings=20))
+    reset(supabase_breaker)
+    reset(model_breaker)
+    with BackgroundServer(fake.app) as server:
+        fake.url = server.url
+        yield fake
+    reset(supabase_breaker)
+    reset(model_breaker)
+
+
+def run_with_repository(db: FakePostgREST, coroutine_fn):
+    """Run `coroutine_fn(repository)` against the fake, with a pool closed afterwards."""
+
+    async def runner():
+        repo = create_repository(db.url, "test-key")
+        try:
+            with registry.override("repository", repo):
+                return await coroutine_fn(repo)
+        finally:
+            await repo.aclose()
+
+    return asyncio.run(runner())
+
+
+def test_breaker_opens_half_opens_and_closes():
+    breaker = CircuitBreaker("test", timeout=0.5, failure_threshold=2, reset_timeout=0.1)
+    calls = 0
+
+    async def failing():
+        nonlocal calls
+        calls += 1
+        raise ConnectionError("down")
+
+    async def healthy():
+        nonlocal calls
+        calls += 1
+        return "ok"
+
+    async def scenario():
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await breaker.call(failing)
+        assert breaker.state == "open"
+
+        # Open: rejected without reaching the dependency.
+        with pytest.raises(CircuitOpen):
+            await breaker.call(healthy)
+        assert calls == 2
+
+        await asyncio.sleep(0.15)
+        assert breaker.state == "half_open"
+        # A failed trial re-opens the circuit for another reset_timeout.
+        with pytest.raises(ConnectionError):
+            await breaker.call(failing)
+        assert breaker.state == "open"
+
+        await asyncio.sleep(0.15)
+        assert await breaker.call(healthy) == "ok"
+        assert breaker.state == "closed"
+        assert breaker.failures == 0
+
+    asyncio.run(scenario())
+
+
+def test_timeouts_count_as_failures():
+    breaker = CircuitBreaker("test", timeout=0.05, failure_threshold=1, reset_timeout=10)
+
+    async def hanging():
+        await asyncio.sleep(1)
+
+    async def scenario():
+        start = time.monotonic()
+        with pytest.raises(asyncio.TimeoutError):
+            await breaker.call(hanging)
+        assert time.monotonic() - start < 0.5
+        assert breaker.state == "open"
+
+    asyncio.run(scenario())
+
+
+def test_hedged_read_wins_over_slow_request(db):
+    # The first request to the fake stalls for a second; the hedge sent after the p95 delay does not.
+    db.slow_rate, db.slow_latency, db.rng = 0.5, 1.0, Draws(0.0)
+    for _ in range(20):
+        supabase_breaker.latency.observe(0.01)
+    won = events("supabase", "hedge_won")
+
+    async def read(repo):
+        start = time.monotonic()
+        result = await repo.list_available_rooms()
+        return result, time.monotonic() - start
+
+    result, elapsed = run_with_repository(db, read)
+
+    assert result and all(room["status"] == "Available" for room in result)
+    assert elapsed < 0.5
+    assert db.calls["rooms"] == 2
+    assert events("supabase", "hedge_won") == won + 1
+
+
+def test_each_occupancy_page_gets_its_own_timeout(db, monkeypatch):
+    monkeypatch.setattr(repository, "OCCUPANCY_PAGE_SIZE", 5)
+    monkeypatch.setattr(supabase_breaker, "timeout", 0.3)
+    monkeypatch.setattr("resilience.HEDGE_READS", False)
+    # Every page takes 0.1s: more than the timeout in total, well within it per page.
+    db.latency = 0.1
+
+    async def read(repo):
+        return await repo.list_occupancy(date.today() - timedelta(days=365))
+
+    rows = run_with_repository(db, read)
+
+    assert len(rows) == 20
+    assert db.calls["bookings"] == 5
+    assert len({row["id"] for row in rows}) == 20
+
+
+def test_stale_rooms_served_while_supabase_fails(db, monkeypatch):
+    monkeypatch.setattr(rooms, "rooms_cache", AsyncTTLCache(ttl=0, stale_ttl=60))
+
+    async def scenario(repo):
+        fresh = await rooms.available_rooms()
+        db.error_rate = 1.0
+        stale = await rooms.available_rooms()
+        return fresh, stale
+
+    fresh, stale = run_with_repository(db, scenario)
+
+    assert stale == fresh
+    assert rooms.rooms_cache.stats()["stale"] == 1
+    assert db.faults["error"] >= 1
+
+
+def test_degraded_answers_while_the_model_is_down(db, monkeypatch):
+    import main
+
+    monkeypatch.setattr(model_breaker, "failure_threshold", 1)
+    monkeypatch.setattr(rooms, "rooms_cache", AsyncTTLCache(ttl=60))
+    monkeypatch.setattr(main.get_intent_router(), "enabled", False)
+    main.response_cache.clear()
+    model, stats = fake_gemini(0, faults=Faults(error_rate=1.0))
+    booking = db.tables["bookings"][0]
+
+    with registry.override("gemini_model", model), registry.override("repository", create_repository(db.url, "test-key")):
+        client = TestClient(main.app)
+        with client:
+            # The injected model error opens the circuit; the guest gets the room list instead of an error.
+            first = client.get("/api/inquire", params={"question": "is breakfast included?"}).text
+            assert "event: error" in first
+            assert model_breaker.state == "open"
+            calls = stats.calls
+
+            degraded = client.get("/api/inquire", params={"question": "is breakfast included?"}).text
+            assert "event: done" in degraded
+            assert main.ASSISTANT_DOWN_ANSWER in degraded
+            assert '"room_number"' in degraded
+
+            answer = client.get("/api/get_booking", params={"booking_id": "when do I check out?"}).json()
+            assert answer["answer"].startswith(main.ASSISTANT_DOWN_ANSWER)
+
+            # Bare booking references never needed the model, so they still work.
+            direct = client.get("/api/get_booking", params={"booking_id": booking["reference_number"]}).json()
+            assert direct["booking"]["reference_number"] == booking["reference_number"]
+            assert stats.calls == calls
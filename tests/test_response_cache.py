@@ -0,0 +1,47 @@
+import pytest
+
+from response_cache import ResponseCache, polarity
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache(ttl=60, max_entries=100, threshold=0.8)
+
+
+@pytest.mark.parametrize(
+    "cached, asked",
+    [
+        ("what family rooms are available", "what family rooms are not available"),
+        ("what family rooms are available", "which family rooms aren't available"),
+        ("any suites available", "any suites unavailable"),
+        ("any suites unavailable", "any suites available"),
+        ("rooms with a balcony", "rooms without a balcony"),
+        ("show all rooms", "show all rooms except suites"),
+    ],
+)
+def test_negated_question_does_not_reuse_answer(cache, cached, asked):
+    cache.store(cached, "Here are the rooms:", ["101"], all_rooms=False)
+
+    assert cache.lookup(asked) is None
+
+
+def test_same_polarity_still_matches(cache):
+    cache.store("which family rooms aren't available", "These rooms are taken:", ["101"], all_rooms=False)
+
+    assert cache.lookup("what family rooms are not available?") is not None
+    assert cache.lookup("which family rooms are available") is None
+
+
+def test_similar_question_hits(cache):
+    cache.store("what family rooms are available", "Here are the family rooms:", ["101"], all_rooms=False)
+
+    assert cache.lookup("what family rooms are available?") is not None
+    assert cache.lookup("which family rooms are available") is not None
+
+
+def test_polarity_markers():
+    assert polarity("rooms available") == ()
+    assert polarity("rooms aren't available") == ("not",)
+    assert polarity("Rooms NOT available, non-smoking") == ("non-smoking", "not")
+    # "under" is a price bound, not a negation; it still changes the key through its own words.
+    assert polarity("rooms under budget") == ()
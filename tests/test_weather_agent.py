@@ -0,0 +1,110 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from pydantic_ai import ModelRetry
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+import registry
+from agent import weather_agent
+from cache import AsyncTTLCache
+from fake_postgrest import BackgroundServer
+
+
+class StubOpenMeteo:
+    """Local open-meteo stand-in that records every query and can be made slow."""
+
+    def __init__(self):
+        self.requests: list[dict[str, str]] = []
+        self.delay = 0.0
+        self.app = Starlette(routes=[Route("/v1/forecast", self.forecast)])
+
+    async def forecast(self, request: Request) -> JSONResponse:
+        self.requests.append(dict(request.query_params))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return JSONResponse({
+            "latitude": float(request.query_params["latitude"]),
+            "longitude": float(request.query_params["longitude"]),
+            "current": {"time": "2026-10-17T03:00", "temperature_2m": 29.4, "wind_speed_10m": 11.2},
+            "hourly": {"time": ["2026-10-17T00:00"], "temperature_2m": [27.0]},
+        })
+
+
+@pytest.fixture(scope="module")
+def stub():
+    stub = StubOpenMeteo()
+    with BackgroundServer(stub.app) as server:
+        stub.url = server.url
+        yield stub
+
+
+@pytest.fixture
+def weather(stub, monkeypatch):
+    stub.requests.clear()
+    stub.delay = 0.0
+    monkeypatch.setattr(weather_agent, "OPEN_METEO_URL", stub.url)
+    monkeypatch.setattr(weather_agent, "weather_cache", AsyncTTLCache(weather_agent.WEATHER_CACHE_TTL))
+    return stub
+
+
+def run_with_client(coroutine_fn):
+    """Run `coroutine_fn()` with a freshly built weather client, closed afterwards."""
+
+    async def runner():
+        client = weather_agent.create_weather_client()
+        try:
+            with registry.override("weather_client", client):
+                return await coroutine_fn()
+        finally:
+            await client.aclose()
+
+    return asyncio.run(runner())
+
+
+def test_requests_only_current_fields(weather):
+    current = run_with_client(lambda: weather_agent.fetch_current_weather(14.5995, 120.9842))
+
+    assert current == {"time": "2026-10-17T03:00", "temperature_2m": 29.4, "wind_speed_10m": 11.2}
+    [query] = weather.requests
+    assert query == {"latitude": "14.6", "longitude": "121.0", "current": weather_agent.CURRENT_FIELDS}
+
+
+def test_cache_hits_per_grid_cell(weather):
+    async def lookups():
+        # Two points in Manila share a cell, and concurrent lookups for it share one request.
+        await asyncio.gather(
+            weather_agent.fetch_current_weather(14.5995, 120.9842),
+            weather_agent.fetch_current_weather(14.6049, 120.9801),
+        )
+        await weather_agent.fetch_current_weather(14.6, 121.0)
+        # Cebu is another cell.
+        await weather_agent.fetch_current_weather(10.3157, 123.8854)
+
+    run_with_client(lookups)
+
+    assert [(q["latitude"], q["longitude"]) for q in weather.requests] == [("14.6", "121.0"), ("10.3", "123.9")]
+    stats = weather_agent.weather_cache.stats()
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (2, 1, 1)
+
+
+def test_slow_response_times_out(weather, monkeypatch):
+    monkeypatch.setattr(weather_agent, "WEATHER_TIMEOUT", 0.2)
+    weather.delay = 2.0
+
+    start = time.monotonic()
+    with pytest.raises(httpx.TimeoutException):
+        run_with_client(lambda: weather_agent.fetch_current_weather(14.5995, 120.9842))
+    assert time.monotonic() - start < 1.0
+
+
+def test_tool_asks_model_to_retry_when_weather_is_down(weather, monkeypatch):
+    monkeypatch.setattr(weather_agent, "WEATHER_TIMEOUT", 0.2)
+    weather.delay = 2.0
+
+    with pytest.raises(ModelRetry):
+        run_with_client(lambda: weather_agent.get_weather(14.5995, 120.9842))
@@ -0,0 +1,158 @@
+import os
+import gzip
+import hashlib
+import logging
+import mimetypes
+from dataclasses import dataclass
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; static assets fall back to gzip only.
+    brotli = None
+
+# ✅ HTTP caching settings
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "500"))
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+STATIC_DIR = Path(__file__).parent / "static"
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+
+@dataclass
+class Asset:
+    content: bytes
+    media_type: str
+    etag: str
+    encodings: dict[str, bytes]
+
+
+class StaticAssets:
+    """Serve a directory with content-hashed URLs and precompressed bodies.
+
+    Every file is read and hashed once at startup. `url("chat.js")` returns
+    `/static/chat.<hash>.js`, which is served with an immutable one-year
+    Cache-Control, so a new deploy changes the URL instead of relying on expiry.
+    Plain names keep working with an ETag and revalidation.
+    """
+
+    def __init__(self, directory: str | Path = STATIC_DIR, prefix: str = "/static"):
+        self.directory = Path(directory)
+        self.prefix = prefix
+        self._assets: dict[str, tuple[Asset, bool]] = {}
+        self._urls: dict[str, str] = {}
+        for path in sorted(p for p in self.directory.rglob("*") if p.is_file()):
+            name = path.relative_to(self.directory).as_posix()
+            asset = self._load(path)
+            hashed = path.relative_to(self.directory).with_name(f"{path.stem}.{asset.etag[1:11]}{path.suffix}").as_posix()
+            self._assets[name] = (asset, False)
+            self._assets[hashed] = (asset, True)
+            self._urls[name] = f"{prefix}/{hashed}"
+        logging.info(f"✅ Fingerprinted {len(self._urls)} static assets.")
+
+    @staticmethod
+    def _load(path: Path) -> Asset:
+        content = path.read_bytes()
+        media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        encodings = {}
+        if media_type.startswith(COMPRESSIBLE_TYPES) and len(content) >= COMPRESS_MIN_SIZE:
+            if brotli is not None:
+                encodings["br"] = brotli.compress(content)
+            encodings["gzip"] = gzip.compress(content, mtime=0)
+        return Asset(content, media_type, f'"{hashlib.sha256(content).hexdigest()[:32]}"', encodings)
+
+    def url(self, name: str) -> str:
+        """Fingerprinted URL for `name`, relative to the static directory."""
+        return self._urls.get(name, f"{self.prefix}/{name}")
+
+    async def serve(self, request: Request) -> Response:
+        entry = self._assets.get(request.path_params["path"])
+        if entry is None:
+            return Response("Not Found", status_code=404)
+        asset, fingerprinted = entry
+        headers = {"ETag": asset.etag, "Cache-Control": IMMUTABLE if fingerprinted else REVALIDATE, "Vary": "Accept-Encoding"}
+        if request.headers.get("if-none-match") == asset.etag:
+            return Response(status_code=304, headers=headers)
+
+        accepted = request.headers.get("accept-encoding", "")
+        for encoding, body in asset.encodings.items():
+            if encoding in accepted:
+                return Response(body, media_type=asset.media_type, headers={**headers, "Content-Encoding": encoding})
+        return Response(asset.content, media_type=asset.media_type, headers=headers)
+
+
+@dataclass
+class CachedPage:
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+    etag: bytes
+
+
+class PageCacheMiddleware:
+    """Render static page shells once and answer repeat visits with a 304 or the cached bytes.
+
+    Only full-page GETs of `paths` are cached (HTMX partial requests pass through).
+    The first successful render is kept for the life of the worker, minus any
+    Set-Cookie header, so pages listed here must not depend on the visitor.
+    """
+
+    def __init__(self, app, paths: tuple[str, ...]):
+        self.app = app
+        self.paths = frozenset(paths)
+        self._pages: dict[str, CachedPage] = {}
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in ("GET", "HEAD")
+            or scope["path"] not in self.paths
+            or Headers(scope=scope).get("hx-request")
+        ):
+            return await self.app(scope, receive, send)
+
+        page = self._pages.get(scope["path"])
+        if page is None:
+            page = await self._render(scope, receive)
+            if page.status != 200:
+                return await self._send(send, page, page.body, page.status)
+            self._pages[scope["path"]] = page
+
+        if Headers(scope=scope).get("if-none-match", "").encode() == page.etag:
+            return await self._send(send, page, b"", 304)
+        await self._send(send, page, b"" if scope["method"] == "HEAD" else page.body, 200)
+
+    async def _render(self, scope, receive) -> CachedPage:
+        start, chunks = {}, []
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+        body = b"".join(chunks)
+        skipped = {b"set-cookie", b"content-length", b"etag", b"cache-control"}
+        headers = [(k, v) for k, v in start.get("headers", []) if k.lower() not in skipped]
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'.encode()
+        return CachedPage(start.get("status", 500), headers, body, etag)
+
+    @staticmethod
+    async def _send(send, page: CachedPage, body: bytes, status: int) -> None:
+        headers = [*page.headers, (b"etag", page.etag), (b"cache-control", REVALIDATE.encode())]
+        if status != 304:
+            headers.append((b"content-length", str(len(page.body)).encode()))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+def compression_middleware() -> Middleware:
+    """Gzip dynamic responses (server-sent event streams are left uncompressed so they aren't buffered)."""
+    return Middleware(GZipMiddleware, minimum_size=COMPRESS_MIN_SIZE)